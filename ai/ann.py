@@ -0,0 +1,142 @@
+import logging
+import numpy as np
+from typing import Any, List, Optional, Tuple
+from ai.vector_store import GrowableArray, select_top_k
+
+logger = logging.getLogger(__name__)
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest-neighbour index (NumPy only).
+    Rows are bucketed by their nearest coarse centroid (spherical k-means on
+    normalized embeddings); a query scores only the rows of the n_probe
+    closest buckets. Raising n_probe trades speed for recall.
+
+    The index stores row positions, not vectors: scoring always reads the
+    caller's embedding matrix. Rows beyond ``size`` (appended since the last
+    add) are the caller's responsibility to scan exactly.
+    """
+    def __init__(
+        self,
+        n_lists: int = 256,
+        n_probe: int = 8,
+        train_size: int = 65536,
+        iterations: int = 10,
+        seed: int = 0,
+    ):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.train_size = train_size
+        self.iterations = iterations
+        self.seed = seed
+
+        self.centroids: Optional[np.ndarray] = None
+        self.lists: List[GrowableArray] = []
+        self.size = 0
+
+    def clone(self) -> "IVFIndex":
+        """An untrained index with the same configuration."""
+        return IVFIndex(self.n_lists, self.n_probe, self.train_size, self.iterations, self.seed)
+
+    def remapped(self, mapping: np.ndarray) -> "IVFIndex":
+        """
+        Copy with row positions renumbered after compaction.
+        mapping[old_row] is the new position, or -1 if the row was dropped;
+        it must cover every indexed row. Centroids are shared, not retrained.
+        """
+        ann = self.clone()
+        ann.centroids = self.centroids
+        ann.lists = []
+        for bucket in self.lists:
+            rows = mapping[bucket.view]
+            remapped = GrowableArray((), dtype=np.int64, capacity=max(64, len(rows)))
+            remapped.extend(rows[rows >= 0])
+            ann.lists.append(remapped)
+        ann.size = int(np.count_nonzero(mapping[:self.size] >= 0))
+        return ann
+
+    @property
+    def is_trained(self) -> bool:
+        return self.centroids is not None
+
+    def _assign(self, vectors: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+        labels = np.empty(len(vectors), dtype=np.intp)
+        for start in range(0, len(vectors), chunk_size):
+            chunk = np.asarray(vectors[start:start + chunk_size], dtype=np.float32)
+            labels[start:start + chunk_size] = np.argmax(chunk @ self.centroids.T, axis=1)
+        return labels
+
+    def train(self, vectors: np.ndarray):
+        """Fit coarse centroids on a sample of vectors. Clears all lists."""
+        rng = np.random.default_rng(self.seed)
+        sample_idx = rng.choice(len(vectors), size=min(len(vectors), self.train_size), replace=False)
+        sample = np.asarray(vectors[np.sort(sample_idx)], dtype=np.float32)
+
+        n_lists = min(self.n_lists, len(sample))
+        self.centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)].copy()
+
+        for _ in range(self.iterations):
+            labels = self._assign(sample)
+            counts = np.bincount(labels, minlength=n_lists)
+
+            # Segmented sums over label-sorted rows
+            order = np.argsort(labels, kind="stable")
+            sums = np.zeros_like(self.centroids)
+            filled = counts > 0
+            starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[filled]
+            sums[filled] = np.add.reduceat(sample[order], starts, axis=0)
+
+            # Re-seed empty lists from random sample rows
+            empty = counts == 0
+            if empty.any():
+                sums[empty] = sample[rng.choice(len(sample), size=int(empty.sum()))]
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            self.centroids = sums / np.maximum(norms, 1e-12)
+
+        self.lists = [GrowableArray((), dtype=np.int64, capacity=64) for _ in range(n_lists)]
+        self.size = 0
+        logger.info(f"IVF index trained: {n_lists} lists on {len(sample)} samples")
+
+    def add(self, vectors: np.ndarray):
+        """Assign vectors to lists. They take row positions size, size + 1, ..."""
+        if not self.is_trained or len(vectors) == 0:
+            return
+        labels = self._assign(vectors)
+        rows = np.arange(self.size, self.size + len(vectors), dtype=np.int64)
+
+        # Group by list so each bucket is extended once
+        order = np.argsort(labels, kind="stable")
+        bounds = np.searchsorted(labels[order], np.arange(len(self.lists) + 1))
+        for list_id in np.flatnonzero(np.diff(bounds)):
+            self.lists[list_id].extend(rows[order[bounds[list_id]:bounds[list_id + 1]]])
+        self.size += len(vectors)
+
+    def candidates(self, query: np.ndarray, n_probe: Optional[int] = None) -> np.ndarray:
+        """Row positions in the n_probe lists closest to the query."""
+        probe = select_top_k(self.centroids @ query, n_probe or self.n_probe)
+        rows = [self.lists[list_id].view for list_id in probe.tolist()]
+        # Ascending order keeps the gather sequential in memory-mapped stores
+        return np.sort(np.concatenate(rows)) if rows else np.empty(0, dtype=np.int64)
+
+    def search(
+        self,
+        matrix: np.ndarray,
+        query: np.ndarray,
+        k: int,
+        n_probe: Optional[int] = None,
+        codec=None,
+        prepared: Any = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Approximate top-k over the indexed rows of matrix. Returns (rows, scores), best first.
+        With a codec, matrix holds its codes and prepared is codec.prepare(query).
+        """
+        rows = self.candidates(query, n_probe)
+        # Rows assigned after the caller took its snapshot are not in matrix yet
+        rows = rows[:np.searchsorted(rows, len(matrix))]
+        if codec is None:
+            scores = np.asarray(matrix[rows], dtype=np.float32) @ query
+        else:
+            scores = codec.score(matrix[rows], prepared)
+        top = select_top_k(scores, k)
+        return rows[top], scores[top]
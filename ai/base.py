@@ -1,10 +1,12 @@
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Iterable, Iterator, Union
 import numpy as np
 
 class Detection:
     """
     Standardized container for situational awareness data.
     """
+    __slots__ = ("class_id", "class_name", "confidence", "bbox", "track_id")
+
     def __init__(
         self,
         class_id: int,
@@ -34,6 +36,131 @@ class Detection:
             "track_id": self.track_id,
         }
 
+class DetectionBatch:
+    """
+    Columnar container for all detections of a frame.
+    Array-backed so downstream engines can operate on whole frames at once.
+    Slicing returns views; boolean/index filtering returns compact copies.
+    """
+    __slots__ = ("class_ids", "confidences", "bboxes", "track_ids", "names")
+
+    NO_TRACK = -1
+
+    def __init__(
+        self,
+        class_ids: np.ndarray,
+        confidences: np.ndarray,
+        bboxes: np.ndarray,
+        track_ids: Optional[np.ndarray] = None,
+        names: Optional[Dict[int, str]] = None,
+    ):
+        self.class_ids = np.asarray(class_ids, dtype=np.int32)
+        self.confidences = np.asarray(confidences, dtype=np.float32)
+        self.bboxes = np.asarray(bboxes, dtype=np.float32).reshape(-1, 4)  # (x1, y1, x2, y2) normalized 0-1
+        if track_ids is None:
+            track_ids = np.full(len(self.class_ids), self.NO_TRACK, dtype=np.int64)
+        self.track_ids = np.asarray(track_ids, dtype=np.int64)
+        self.names = names if names is not None else {}
+
+    @classmethod
+    def empty(cls, names: Optional[Dict[int, str]] = None) -> "DetectionBatch":
+        return cls(
+            np.empty(0, dtype=np.int32),
+            np.empty(0, dtype=np.float32),
+            np.empty((0, 4), dtype=np.float32),
+            names=names,
+        )
+
+    @classmethod
+    def from_detections(cls, detections: List[Detection], names: Optional[Dict[int, str]] = None) -> "DetectionBatch":
+        """Pack a list of Detection objects into columnar form."""
+        if not detections:
+            return cls.empty(names)
+
+        names = dict(names) if names is not None else {}
+        for d in detections:
+            names.setdefault(d.class_id, d.class_name)
+
+        return cls(
+            np.fromiter((d.class_id for d in detections), dtype=np.int32, count=len(detections)),
+            np.fromiter((d.confidence for d in detections), dtype=np.float32, count=len(detections)),
+            np.array([d.bbox for d in detections], dtype=np.float32),
+            np.fromiter(
+                (cls.NO_TRACK if d.track_id is None else d.track_id for d in detections),
+                dtype=np.int64, count=len(detections),
+            ),
+            names=names,
+        )
+
+    def __len__(self) -> int:
+        return len(self.class_ids)
+
+    def __getitem__(self, index: Union[int, slice, np.ndarray]) -> Union[Detection, "DetectionBatch"]:
+        if isinstance(index, (int, np.integer)):
+            return self._row(int(index))
+        return DetectionBatch(
+            self.class_ids[index],
+            self.confidences[index],
+            self.bboxes[index],
+            self.track_ids[index],
+            names=self.names,
+        )
+
+    def __iter__(self) -> Iterator[Detection]:
+        """Lazily materialize Detection objects."""
+        for i in range(len(self)):
+            yield self._row(i)
+
+    def _row(self, i: int) -> Detection:
+        class_id = int(self.class_ids[i])
+        track_id = int(self.track_ids[i])
+        return Detection(
+            class_id=class_id,
+            class_name=self.names.get(class_id, str(class_id)),
+            confidence=float(self.confidences[i]),
+            bbox=tuple(self.bboxes[i].tolist()),
+            track_id=None if track_id == self.NO_TRACK else track_id,
+        )
+
+    @property
+    def class_names(self) -> List[str]:
+        return [self.names.get(c, str(c)) for c in self.class_ids.tolist()]
+
+    def class_mask(self, classes: Iterable[Union[int, str]]) -> np.ndarray:
+        """Boolean mask of rows whose class id or class name is in classes."""
+        wanted = set()
+        lookup = {name: class_id for class_id, name in self.names.items()}
+        for c in classes:
+            if isinstance(c, str):
+                if c in lookup:
+                    wanted.add(lookup[c])
+            else:
+                wanted.add(int(c))
+        return np.isin(self.class_ids, np.fromiter(wanted, dtype=np.int32, count=len(wanted)))
+
+    def filter(
+        self,
+        classes: Optional[Iterable[Union[int, str]]] = None,
+        min_confidence: Optional[float] = None,
+    ) -> "DetectionBatch":
+        """Select rows by class (id or name) and minimum confidence."""
+        mask = np.ones(len(self), dtype=bool)
+        if classes is not None:
+            mask &= self.class_mask(classes)
+        if min_confidence is not None:
+            mask &= self.confidences >= min_confidence
+        return self[mask]
+
+    def contact_points(self) -> np.ndarray:
+        """Bottom-center of each bbox as an Nx2 array."""
+        points = np.empty((len(self), 2), dtype=np.float32)
+        points[:, 0] = (self.bboxes[:, 0] + self.bboxes[:, 2]) / 2
+        points[:, 1] = self.bboxes[:, 3]
+        return points
+
+    def to_detections(self) -> List[Detection]:
+        return list(self)
+
 class BaseDetector:
     """
     Interface for AI model integration. 
@@ -45,3 +172,11 @@ class BaseDetector:
     def detect(self, frame: np.ndarray) -> List[Detection]:
         """Run inference on a single frame."""
         raise NotImplementedError("Detectors must implement the detect method.")
+
+    def detect_batch(self, frames: List[np.ndarray]) -> List[List[Detection]]:
+        """Run inference on several frames. Override to use a batched forward pass."""
+        return [self.detect(frame) for frame in frames]
+
+    def detect_columnar(self, frame: np.ndarray) -> DetectionBatch:
+        """Run inference returning a columnar DetectionBatch."""
+        return DetectionBatch.from_detections(self.detect(frame))
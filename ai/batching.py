@@ -0,0 +1,125 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Generic, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+class MicroBatcher(Generic[T, R]):
+    """
+    Asynchronous micro-batching front-end.
+    Coalesces items submitted from many streams into a single batched call,
+    dispatched when either max_batch_size is reached or the oldest item has
+    waited max_latency seconds.
+    """
+    def __init__(
+        self,
+        batch_fn: Callable[[List[T]], List[R]],
+        max_batch_size: int = 8,
+        max_latency: float = 0.01,
+        name: str = "batcher",
+    ):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_latency = max_latency
+        self.name = name
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._collector: Optional[asyncio.Task] = None
+        # Items taken off the queue whose futures are not resolved yet
+        self._in_flight: List[Tuple[T, asyncio.Future]] = []
+        # A single thread keeps batched forward passes strictly sequential
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"sentinel-{name}")
+
+        # Operational Metrics
+        self.batches = 0
+        self.items = 0
+
+    async def submit(self, item: T) -> R:
+        """Queue an item for the next batch and wait for its result."""
+        if self._collector is None:
+            self._queue = asyncio.Queue()
+            self._collector = asyncio.create_task(self._collect())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    async def close(self):
+        """Stop the collector and release the execution thread."""
+        if self._collector:
+            self._collector.cancel()
+            await asyncio.gather(self._collector, return_exceptions=True)
+            self._collector = None
+
+            # Nobody will resolve these any more: the batch being gathered or
+            # executed, and everything still queued
+            pending = self._in_flight
+            self._in_flight = []
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+            for _, future in pending:
+                if not future.done():
+                    future.cancel()
+
+        self._executor.shutdown(wait=True)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Snapshot of batching efficiency."""
+        return {
+            "batches": self.batches,
+            "items": self.items,
+            "mean_batch_size": self.items / self.batches if self.batches else 0.0,
+        }
+
+    async def _gather_batch(self) -> List[Tuple[T, asyncio.Future]]:
+        loop = asyncio.get_running_loop()
+        batch = self._in_flight = [await self._queue.get()]
+        deadline = loop.time() + self.max_latency
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = await self._gather_batch()
+            # Callers that gave up while waiting are not worth computing
+            batch = self._in_flight = [(item, future) for item, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+
+            items = [item for item, _ in batch]
+            try:
+                results = await loop.run_in_executor(self._executor, self.batch_fn, items)
+            except Exception as e:
+                logger.error(f"Batched execution failure [{self.name}]: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.items += len(batch)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+            if len(results) < len(batch):
+                error = RuntimeError(f"Batched execution [{self.name}] returned {len(results)} results for {len(batch)} items")
+                logger.error(str(error))
+                for _, future in batch[len(results):]:
+                    if not future.done():
+                        future.set_exception(error)
+            self._in_flight = []
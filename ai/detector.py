@@ -2,7 +2,7 @@ import cv2
 import numpy as np
 import logging
 from typing import List, Optional, Tuple
-from ai.base import BaseDetector, Detection
+from ai.base import BaseDetector, Detection, DetectionBatch
 from core.accelerator import HardwareAccelerator
 
 # Note: Requires 'ultralytics' to be installed for full functionality
@@ -49,23 +49,62 @@ class YOLODetector(BaseDetector):
             return []
 
         results = self.model(frame, conf=self.confidence_threshold, verbose=False)[0]
-        detections = []
-        h, w = frame.shape[:2]
-
-        for box in results.boxes:
-            class_id = int(box.cls[0])
-            class_name = self.model.names[class_id]
-            confidence = float(box.conf[0])
-            
-            # Normalize BBox (x1, y1, x2, y2)
-            coords = box.xyxy[0].cpu().numpy()
-            bbox = (coords[0]/w, coords[1]/h, coords[2]/w, coords[3]/h)
-
-            detections.append(Detection(
+        return self._decode(results, frame.shape)
+
+    def detect_batch(self, frames: List[np.ndarray]) -> List[List[Detection]]:
+        """Run a single batched forward pass over frames from any number of streams."""
+        if self.model is None:
+            return [[] for _ in frames]
+        if not frames:
+            return []
+
+        results = self.model(list(frames), conf=self.confidence_threshold, verbose=False)
+        return [self._decode(result, frame.shape) for result, frame in zip(results, frames)]
+
+    def detect_arrays(self, frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Run inference without building Detection objects.
+        Returns (class_ids, confidences, bboxes) with bboxes as normalized Nx4 (x1, y1, x2, y2).
+        """
+        if self.model is None:
+            return self._extract(None, frame.shape)
+
+        results = self.model(frame, conf=self.confidence_threshold, verbose=False)[0]
+        return self._extract(results, frame.shape)
+
+    def detect_columnar(self, frame: np.ndarray) -> DetectionBatch:
+        """Run inference returning a DetectionBatch built directly from the result arrays."""
+        class_ids, confidences, bboxes = self.detect_arrays(frame)
+        names = self.model.names if self.model is not None else {}
+        return DetectionBatch(class_ids, confidences, bboxes, names=names)
+
+    def _extract(self, results, shape: Tuple[int, ...]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        if results is None or len(results.boxes) == 0:
+            return (
+                np.empty(0, dtype=np.int32),
+                np.empty(0, dtype=np.float32),
+                np.empty((0, 4), dtype=np.float32),
+            )
+
+        # Single device-to-host transfer: rows are [x1, y1, x2, y2, (track), conf, cls]
+        data = results.boxes.data.float().cpu().numpy()
+        h, w = shape[:2]
+
+        bboxes = data[:, :4] / np.array([w, h, w, h], dtype=np.float32)
+        confidences = np.ascontiguousarray(data[:, -2])
+        class_ids = data[:, -1].astype(np.int32)
+        return class_ids, confidences, bboxes
+
+    def _decode(self, results, shape: Tuple[int, ...]) -> List[Detection]:
+        class_ids, confidences, bboxes = self._extract(results, shape)
+        names = self.model.names
+
+        return [
+            Detection(
                 class_id=class_id,
-                class_name=class_name,
+                class_name=names[class_id],
                 confidence=confidence,
-                bbox=bbox
-            ))
-
-        return detections
+                bbox=tuple(bbox)
+            )
+            for class_id, confidence, bbox in zip(class_ids.tolist(), confidences.tolist(), bboxes.tolist())
+        ]
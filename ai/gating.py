@@ -0,0 +1,114 @@
+import cv2
+import logging
+import threading
+import time
+import numpy as np
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class GateConfig:
+    """
+    Near-duplicate suppression settings for one camera.
+    A frame is skipped when it is too similar to the last indexed frame of
+    the same camera, unless max_interval seconds have passed since then.
+    """
+    pixel_threshold: Optional[float] = 3.0  # Mean abs grayscale diff (0-255) on the thumbnail
+    embedding_threshold: Optional[float] = 0.97  # Cosine similarity to the last indexed embedding
+    thumbnail_size: Tuple[int, int] = (32, 32)
+    max_interval: Optional[float] = 60.0  # Seconds; always index at least this often
+
+class _CameraState:
+    __slots__ = ("thumbnail", "embedding", "last_admitted", "last_embedded", "seen", "skipped_pixel", "skipped_embedding")
+
+    def __init__(self):
+        self.thumbnail: Optional[np.ndarray] = None
+        self.embedding: Optional[np.ndarray] = None
+        self.last_admitted = 0.0  # Last frame passing the pixel check
+        self.last_embedded = 0.0  # Last embedding passing the embedding check
+        self.seen = 0
+        self.skipped_pixel = 0
+        self.skipped_embedding = 0
+
+class FrameGate:
+    """
+    Cheap change-detection stage in front of semantic indexing.
+    admit_frame() runs before encoding on a downscaled grayscale thumbnail;
+    admit_embedding() runs after encoding against the last indexed embedding.
+    """
+    def __init__(self, default_config: Optional[GateConfig] = None):
+        self.default_config = default_config or GateConfig()
+        self.configs: Dict[int, GateConfig] = {}
+        self._cameras: Dict[int, _CameraState] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, camera_id: int, config: GateConfig):
+        """Override the gating profile of one camera."""
+        self.configs[camera_id] = config
+
+    def _state(self, camera_id: int) -> _CameraState:
+        state = self._cameras.get(camera_id)
+        if state is None:
+            state = self._cameras[camera_id] = _CameraState()
+        return state
+
+    def _due(self, config: GateConfig, since: float, now: float) -> bool:
+        return config.max_interval is not None and now - since >= config.max_interval
+
+    def admit_frame(self, camera_id: int, frame: np.ndarray) -> bool:
+        """Pre-encoding check. Returns False if the frame is a near-duplicate."""
+        config = self.configs.get(camera_id, self.default_config)
+        if config.pixel_threshold is None:
+            with self._lock:
+                self._state(camera_id).seen += 1
+            return True
+
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        thumbnail = cv2.resize(gray, config.thumbnail_size, interpolation=cv2.INTER_AREA).astype(np.float32)
+        now = time.monotonic()
+
+        with self._lock:
+            state = self._state(camera_id)
+            state.seen += 1
+            if state.thumbnail is not None and not self._due(config, state.last_admitted, now):
+                if float(np.mean(np.abs(thumbnail - state.thumbnail))) < config.pixel_threshold:
+                    state.skipped_pixel += 1
+                    return False
+            state.thumbnail = thumbnail
+            state.last_admitted = now
+            return True
+
+    def admit_embedding(self, camera_id: int, embedding: np.ndarray) -> bool:
+        """Post-encoding check against the camera's last indexed (normalized) embedding."""
+        config = self.configs.get(camera_id, self.default_config)
+        now = time.monotonic()
+
+        with self._lock:
+            state = self._state(camera_id)
+            if (
+                config.embedding_threshold is not None
+                and state.embedding is not None
+                and not self._due(config, state.last_embedded, now)
+                and float(np.dot(state.embedding, embedding)) >= config.embedding_threshold
+            ):
+                state.skipped_embedding += 1
+                return False
+
+            state.embedding = embedding
+            state.last_embedded = now
+            return True
+
+    def get_stats(self) -> Dict[int, Dict[str, Any]]:
+        """Per-camera counts of seen and skipped frames."""
+        with self._lock:
+            return {
+                camera_id: {
+                    "seen": state.seen,
+                    "skipped_pixel": state.skipped_pixel,
+                    "skipped_embedding": state.skipped_embedding,
+                    "skipped": state.skipped_pixel + state.skipped_embedding,
+                }
+                for camera_id, state in self._cameras.items()
+            }
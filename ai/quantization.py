@@ -0,0 +1,271 @@
+import logging
+import numpy as np
+from typing import Any, Dict, Optional, Tuple, Type
+from ai.vector_store import top_k_search
+
+logger = logging.getLogger(__name__)
+
+class VectorCodec:
+    """
+    Storage encoding for normalized embeddings (float32 baseline).
+    Codes are fixed-size rows that fit a GrowableArray/MappedArray. Queries
+    are scored against codes directly: prepare() turns a query into whatever
+    score() needs, once per query.
+    """
+    name = "f32"
+    dtype = np.dtype(np.float32)
+    requires_training = False
+
+    @property
+    def is_trained(self) -> bool:
+        return True
+
+    def code_shape(self, dim: int) -> Tuple[int, ...]:
+        return (dim,)
+
+    def bytes_per_vector(self, dim: int) -> int:
+        return int(np.prod(self.code_shape(dim))) * self.dtype.itemsize
+
+    def check_dim(self, dim: int):
+        """Raise ValueError if vectors of this dimension cannot be encoded."""
+
+    def train(self, vectors: np.ndarray):
+        """Fit codec parameters on a sample (no-op for stateless codecs)."""
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.asarray(vectors, dtype=np.float32)
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        return np.asarray(codes, dtype=np.float32)
+
+    def prepare(self, query: np.ndarray) -> Any:
+        return np.asarray(query, dtype=np.float32)
+
+    def score(self, codes: np.ndarray, prepared: Any) -> np.ndarray:
+        """Inner products between stored codes and a prepared query."""
+        return np.dot(codes, prepared)
+
+    def config(self) -> Dict[str, Any]:
+        return {"name": self.name}
+
+    def state(self) -> Optional[np.ndarray]:
+        """Learned parameters to persist, if any."""
+        return None
+
+    def load_state(self, state: np.ndarray):
+        pass
+
+class Float16Codec(VectorCodec):
+    """Half-precision storage; 2x smaller, scored in small widened blocks."""
+    name = "f16"
+    dtype = np.dtype(np.float16)
+    block_size = 4096
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        return np.asarray(vectors, dtype=np.float16)
+
+    def score(self, codes: np.ndarray, prepared: np.ndarray) -> np.ndarray:
+        # NumPy has no float16 BLAS path; widening cache-sized blocks is far faster
+        scores = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), self.block_size):
+            scores[start:start + self.block_size] = codes[start:start + self.block_size].astype(np.float32) @ prepared
+        return scores
+
+class Int8Codec(VectorCodec):
+    """
+    Scalar quantization with a per-vector scale; ~4x smaller.
+    Each row holds dim int8 values followed by the float32 scale.
+    """
+    name = "i8"
+    dtype = np.dtype(np.uint8)
+    block_size = 4096
+
+    def code_shape(self, dim: int) -> Tuple[int, ...]:
+        return (dim + 4,)
+
+    def encode(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(vectors), -1)
+        scale = np.abs(vectors).max(axis=1, keepdims=True) / 127.0
+        scale = np.maximum(scale, 1e-12).astype(np.float32)
+        codes = np.empty((len(vectors), vectors.shape[1] + 4), dtype=np.uint8)
+        codes[:, :-4] = np.rint(vectors / scale).astype(np.int8).view(np.uint8)
+        codes[:, -4:] = scale.view(np.uint8)
+        return codes
+
+    def _split(self, codes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        values = codes[:, :-4].view(np.int8)
+        scale = np.ascontiguousarray(codes[:, -4:]).view(np.float32)[:, 0]
+        return values, scale
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        values, scale = self._split(codes)
+        return values.astype(np.float32) * scale[:, None]
+
+    def score(self, codes: np.ndarray, prepared: np.ndarray) -> np.ndarray:
+        # Widening happens per cache-sized block, not per query chunk
+        scores = np.empty(len(codes), dtype=np.float32)
+        for start in range(0, len(codes), self.block_size):
+            values, scale = self._split(codes[start:start + self.block_size])
+            scores[start:start + self.block_size] = (values @ prepared) * scale
+        return scores
+
+class PQCodec(VectorCodec):
+    """
+    Product quantization: each vector is split into n_subvectors slices, and
+    each slice is stored as the id of its nearest of n_centroids (<= 256)
+    sub-centroids, i.e. n_subvectors bytes per vector.
+
+    Scoring uses asymmetric distance computation: the full-precision query is
+    turned into an n_subvectors x n_centroids table of partial inner
+    products, and a vector's score is the sum of its table entries.
+    """
+    name = "pq"
+    dtype = np.dtype(np.uint8)
+    requires_training = True
+
+    def __init__(
+        self,
+        n_subvectors: int = 48,
+        n_centroids: int = 256,
+        train_size: int = 20000,
+        iterations: int = 15,
+        seed: int = 0,
+    ):
+        if n_centroids > 256:
+            raise ValueError("PQCodec stores one byte per sub-vector: n_centroids must be <= 256")
+        self.n_subvectors = n_subvectors
+        self.n_centroids = n_centroids
+        self.train_size = train_size
+        self.iterations = iterations
+        self.seed = seed
+        self.codebooks: Optional[np.ndarray] = None  # (n_subvectors, n_centroids, sub_dim)
+
+    @property
+    def is_trained(self) -> bool:
+        return self.codebooks is not None
+
+    def code_shape(self, dim: int) -> Tuple[int, ...]:
+        return (self.n_subvectors,)
+
+    def check_dim(self, dim: int):
+        if dim % self.n_subvectors:
+            raise ValueError(f"Dimension {dim} is not divisible by {self.n_subvectors} sub-vectors")
+
+    def _subvectors(self, vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        self.check_dim(vectors.shape[1])
+        return vectors.reshape(len(vectors), self.n_subvectors, -1)
+
+    def _nearest(self, sub: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+        # argmin ||x - c||^2 == argmax (x.c - ||c||^2 / 2)
+        return np.argmax(sub @ centroids.T - 0.5 * np.einsum('kd,kd->k', centroids, centroids), axis=1)
+
+    def train(self, vectors: np.ndarray):
+        """Fit one k-means codebook per sub-space on a sample of vectors."""
+        rng = np.random.default_rng(self.seed)
+        sample_idx = rng.choice(len(vectors), size=min(len(vectors), self.train_size), replace=False)
+        sample = self._subvectors(np.asarray(vectors[np.sort(sample_idx)]))
+        k = min(self.n_centroids, len(sample))
+
+        codebooks = np.empty((self.n_subvectors, k, sample.shape[2]), dtype=np.float32)
+        for m in range(self.n_subvectors):
+            sub = sample[:, m]
+            centroids = sub[rng.choice(len(sub), size=k, replace=False)].copy()
+            for _ in range(self.iterations):
+                labels = self._nearest(sub, centroids)
+                counts = np.bincount(labels, minlength=k)
+
+                # Segmented sums over label-sorted rows
+                order = np.argsort(labels, kind="stable")
+                filled = counts > 0
+                starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[filled]
+                centroids[filled] = np.add.reduceat(sub[order], starts, axis=0) / counts[filled, None]
+
+                # Re-seed empty centroids from random sample rows
+                empty = ~filled
+                if empty.any():
+                    centroids[empty] = sub[rng.choice(len(sub), size=int(empty.sum()))]
+            codebooks[m] = centroids
+
+        self.codebooks = codebooks
+        logger.info(f"PQ codebooks trained: {self.n_subvectors} x {k} on {len(sample)} samples")
+
+    def encode(self, vectors: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+        sub = self._subvectors(np.asarray(vectors).reshape(len(vectors), -1))
+        codes = np.empty((len(sub), self.n_subvectors), dtype=np.uint8)
+        for start in range(0, len(sub), chunk_size):
+            for m in range(self.n_subvectors):
+                codes[start:start + chunk_size, m] = self._nearest(sub[start:start + chunk_size, m], self.codebooks[m])
+        return codes
+
+    def decode(self, codes: np.ndarray) -> np.ndarray:
+        parts = self.codebooks[np.arange(self.n_subvectors), codes.astype(np.intp)]
+        return parts.reshape(len(codes), -1)
+
+    def prepare(self, query: np.ndarray) -> np.ndarray:
+        """Flattened (n_subvectors * n_centroids) table of partial inner products."""
+        sub = np.asarray(query, dtype=np.float32).reshape(self.n_subvectors, -1)
+        return np.einsum('mkd,md->mk', self.codebooks, sub).ravel()
+
+    def score(self, codes: np.ndarray, prepared: np.ndarray) -> np.ndarray:
+        offsets = np.arange(self.n_subvectors, dtype=np.intp) * self.codebooks.shape[1]
+        return prepared[codes.astype(np.intp) + offsets].sum(axis=1, dtype=np.float32)
+
+    def config(self) -> Dict[str, Any]:
+        # train_size decides when a reopened index with staged rows trains
+        return {
+            "name": self.name, "n_subvectors": self.n_subvectors,
+            "n_centroids": self.n_centroids, "train_size": self.train_size,
+        }
+
+    def state(self) -> Optional[np.ndarray]:
+        return self.codebooks
+
+    def load_state(self, state: np.ndarray):
+        self.codebooks = np.asarray(state, dtype=np.float32)
+
+CODECS: Dict[str, Type[VectorCodec]] = {
+    codec.name: codec for codec in (VectorCodec, Float16Codec, Int8Codec, PQCodec)
+}
+
+def codec_from_config(config: Dict[str, Any]) -> VectorCodec:
+    """Rebuild a codec from its config() dictionary."""
+    params = dict(config)
+    return CODECS[params.pop("name")](**params)
+
+class DecodedMatrix:
+    """Read-only float32 view over stored codes; rows are decoded on access."""
+    def __init__(self, codes: np.ndarray, codec: VectorCodec):
+        self.codes = codes
+        self.codec = codec
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def __getitem__(self, index) -> np.ndarray:
+        return self.codec.decode(np.atleast_2d(self.codes[index]))
+
+def evaluate_codec(
+    codec: VectorCodec, vectors: np.ndarray, queries: np.ndarray, top_k: int = 10
+) -> Dict[str, float]:
+    """
+    Memory footprint and recall@top_k of a codec against exact float32
+    search on a sample. Trains the codec first if it needs training.
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if codec.requires_training and not codec.is_trained:
+        codec.train(vectors)
+    codes = codec.encode(vectors)
+
+    recalls = []
+    for query in queries:
+        exact = top_k_search(vectors, query, top_k)[0]
+        approx = top_k_search(codes, codec.prepare(query), top_k, codec=codec)[0]
+        recalls.append(len(np.intersect1d(exact, approx)) / top_k)
+
+    dim = vectors.shape[1]
+    return {
+        "bytes_per_vector": codec.bytes_per_vector(dim),
+        "compression": 4 * dim / codec.bytes_per_vector(dim),
+        "recall": float(np.mean(recalls)),
+    }
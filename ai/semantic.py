@@ -1,19 +1,81 @@
 import logging
+import os
 import threading
 import json
+import numbers
+import time
 import numpy as np
-from typing import List, Optional, Dict, Any, Tuple
-from dataclasses import dataclass
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, Iterable, List, Optional, Dict, Any, Tuple, Union
+from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
 
-from core.accelerator import HardwareAccelerator
+from ai.vector_store import GrowableArray, MappedArray, merge_top_k, top_k_search, top_k_search_rows
+from ai.quantization import CODECS, DecodedMatrix, VectorCodec, codec_from_config
+from ai.ann import IVFIndex
+from ai.batching import MicroBatcher
+from ai.gating import FrameGate
 
 logger = logging.getLogger(__name__)
 
 # Institutional Defaults
 DEFAULT_MODEL = "ViT-L/14"
 
+# On-disk index layout
+INDEX_FORMAT = 2
+MANIFEST_FILE = "manifest.json"
+EMBEDDINGS_FILE = "embeddings.{codec}"
+CODEC_STATE = "codec.npy"
+EXTRAS_LOG = "extras.jsonl"
+CAMERA_COLUMN = "camera_ids.i64"
+TIME_COLUMN = "timestamps.f64"
+ROW_ID_COLUMN = "row_ids.i64"
+STAGING_COLUMN = "staging.f32"  # Raw rows awaiting codec training
+METADATA_LOG = "metadata.jsonl"  # Format 1 only
+DECODE_CHUNK_ROWS = 4096  # Rows decoded at a time when feeding compressed embeddings to the ANN
+
+GENERATION_FILES = {EMBEDDINGS_FILE.format(codec=name) for name in CODECS} | {
+    EXTRAS_LOG, CAMERA_COLUMN, TIME_COLUMN, ROW_ID_COLUMN, STAGING_COLUMN
+}
+
+TimeBound = Union[datetime, float]
+RESERVED_KEYS = ("camera_id", "timestamp")  # Result metadata keys backed by columns, not extras
+
+def _epoch(value: TimeBound) -> float:
+    return value.timestamp() if isinstance(value, datetime) else float(value)
+
+def _route_reserved(
+    where: Dict[str, Any],
+    camera_ids: Optional[Union[int, Iterable[int]]],
+    start: Optional[TimeBound],
+    end: Optional[TimeBound],
+) -> Tuple[Optional[Union[int, Iterable[int]]], Optional[TimeBound], Optional[TimeBound], Dict[str, Any]]:
+    """
+    Turns where-clauses on the column-backed metadata keys into camera and time filters.
+    Timestamps match at the microsecond resolution of the isoformat in result metadata.
+    """
+    where = dict(where)
+    if "camera_id" in where:
+        camera = where.pop("camera_id")
+        if camera_ids is None:
+            camera_ids = camera
+        else:
+            ids = [camera_ids] if isinstance(camera_ids, numbers.Integral) else list(camera_ids)
+            camera_ids = [camera] if camera in ids else []
+    if "timestamp" in where:
+        value = where.pop("timestamp")
+        moment = _epoch(datetime.fromisoformat(value) if isinstance(value, str) else value)
+        lo, hi = moment - 5e-7, moment + 5e-7
+        start = lo if start is None else max(_epoch(start), lo)
+        end = hi if end is None else min(_epoch(end), hi)
+    return camera_ids, start, end, where
+
+def _entry_id(row_id: int, camera_id: int, timestamp: datetime) -> str:
+    # The row id suffix keeps ids unique for frames indexed within the same microsecond
+    return f"unit{camera_id}_{timestamp.strftime('%Y%m%d_%H%M%S_%f')}_{row_id}"
+
 @dataclass
 class SemanticResult:
     """
@@ -24,27 +86,299 @@ class SemanticResult:
     timestamp: datetime
     similarity: float
     metadata: Dict[str, Any]
+    row_id: int = -1
+
+@dataclass
+class SavedSearch:
+    """
+    Standing natural language query.
+    Every newly indexed frame is scored against it; frames at or above the
+    threshold are kept as matches (newest max_matches) and reported to the
+    optional callback.
+    """
+    name: str
+    text: str
+    embedding: np.ndarray
+    threshold: float = 0.25
+    max_matches: int = 1000
+    callback: Optional[Callable[["SavedSearch", SemanticResult], None]] = None
+    matches: Deque[SemanticResult] = field(default_factory=deque)
+
+    def __post_init__(self):
+        self.matches = deque(self.matches, maxlen=self.max_matches)
+
+class _IndexData:
+    """
+    Row-aligned columns of one index generation: embedding codes (or raw
+    rows staged for codec training), camera id, epoch timestamp and integer
+    row id. Extra per-entry metadata is kept sparsely, keyed by row id.
+
+    Persistent generations live in directory; generation 0 uses the bare
+    file names, later generations (written by compaction) add a suffix.
+    """
+    def __init__(self, directory: Optional[Path], generation: int = 0):
+        self.directory = directory
+        self.generation = generation
+        self.dim: Optional[int] = None
+        self.store: Optional[GrowableArray] = None
+        self.staging: Optional[GrowableArray] = None
+        self.cameras: Optional[GrowableArray] = None
+        self.times: Optional[GrowableArray] = None
+        self.row_ids: Optional[GrowableArray] = None
+        self.extras: Dict[int, Dict[str, Any]] = {}
+        self.time_sorted = True  # Append order normally is time order; enables searchsorted
+        self._extras_log = None
+
+    def __len__(self) -> int:
+        return len(self.row_ids) if self.row_ids is not None else 0
+
+    def path(self, name: str) -> Path:
+        return self.directory / (name if self.generation == 0 else f"{name}.{self.generation}")
+
+    def _array(self, name: str, row_shape: Tuple[int, ...], dtype, size: int, capacity: int) -> GrowableArray:
+        if self.directory is None:
+            return GrowableArray(row_shape, dtype=dtype, capacity=capacity)
+        return MappedArray(self.path(name), row_shape, dtype, size=size, capacity=capacity)
+
+    def open_columns(self, size: int = 0, capacity: int = 1024):
+        self.cameras = self._array(CAMERA_COLUMN, (), np.int64, size, capacity)
+        self.times = self._array(TIME_COLUMN, (), np.float64, size, capacity)
+        self.row_ids = self._array(ROW_ID_COLUMN, (), np.int64, size, capacity)
+        times = self.times.view
+        self.time_sorted = bool(np.all(times[1:] >= times[:-1]))
+
+    def open_store(self, codec: VectorCodec, dim: int, size: int = 0, capacity: int = 1024):
+        self.dim = dim
+        name = EMBEDDINGS_FILE.format(codec=codec.name)
+        self.store = self._array(name, codec.code_shape(dim), codec.dtype, size, capacity)
+
+    def open_staging(self, dim: int, size: int = 0, capacity: int = 1024):
+        self.dim = dim
+        self.staging = self._array(STAGING_COLUMN, (dim,), np.float32, size, capacity)
+
+    def drop_staging(self):
+        """Forget the staged rows once they are encoded and committed."""
+        self.staging = None
+        if self.directory is not None:
+            self.path(STAGING_COLUMN).unlink(missing_ok=True)
+
+    @property
+    def vectors(self) -> GrowableArray:
+        """The row-holding array: encoded store, or staging before codec training."""
+        return self.store if self.store is not None else self.staging
+
+    def add_extra(self, row_id: int, extra: Dict[str, Any], record: Optional[str] = None):
+        """Attach metadata to a row; record is its pre-serialized log line, if already built."""
+        if record is None:
+            record = json.dumps({"row": row_id, **extra})
+        self.extras[row_id] = extra
+        if self.directory is not None:
+            if self._extras_log is None:
+                self._extras_log = open(self.path(EXTRAS_LOG), 'a')
+            self._extras_log.write(record + "\n")
+
+    def load_extras(self, next_row_id: int):
+        """Replay the extras log; records of uncommitted rows are a torn tail."""
+        path = self.path(EXTRAS_LOG)
+        if not path.exists():
+            return
+        with open(path, 'rb+') as f:
+            while True:
+                position = f.tell()
+                line = f.readline()
+                if not line:
+                    break
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None
+                if record is None or record['row'] >= next_row_id:
+                    f.truncate(position)
+                    break
+                self.extras[record.pop('row')] = record
+
+    def flush(self):
+        for array in (self.store, self.staging, self.cameras, self.times, self.row_ids):
+            if array is not None:
+                array.flush()
+        if self._extras_log is not None:
+            self._extras_log.flush()
+            os.fsync(self._extras_log.fileno())
+
+    def close(self):
+        if self._extras_log is not None:
+            self._extras_log.close()
+            self._extras_log = None
+
+@dataclass
+class _Snapshot:
+    """Consistent read view of the index taken under the engine lock."""
+    matrix: np.ndarray
+    codec: Optional[VectorCodec]
+    cameras: np.ndarray
+    times: np.ndarray
+    row_ids: np.ndarray
+    extras: Dict[int, Dict[str, Any]]
+    time_sorted: bool
+    ann: Optional[IVFIndex]
 
 class SemanticEngine:
     """
     Sovereign Semantic Search Engine.
     Utilizes CLIP embeddings to enable natural language querying across technical data streams.
+
+    Entries are stored as row-aligned columns: embedding codes, camera id,
+    epoch timestamp and an integer row id that never changes. Optional extra
+    metadata is kept sparsely per row id.
+
+    With persist=True the columns are append-only memory-mapped files in
+    index_dir, with an extras log next to them. manifest.json holds the
+    committed row count and is replaced atomically every flush_every
+    entries, so a crash loses at most the uncommitted tail.
+
+    compact()/apply_retention() drop old entries by writing the surviving
+    rows to a new file generation off-lock. The new generation is swapped in
+    and published by the manifest, so memory and disk follow the retention
+    window rather than total uptime.
+
+    An optional IVFIndex serves approximate queries. It is (re)trained on a
+    background thread once the index reaches ann_min_rows and again each
+    time it doubles; new entries are assigned incrementally, and rows not
+    yet covered are scanned exactly.
+
+    index_batch() preprocesses frames on a thread pool and encodes them in
+    one forward pass; index_async() feeds a micro-batching queue so frames
+    from many cameras share full batches.
+
+    An optional FrameGate skips near-duplicate frames before encoding (pixel
+    check) and before storage (embedding check); skipped frames yield None.
+
+    Text embeddings are LRU-cached (text_cache_size entries). Saved searches
+    score each newly indexed frame as it arrives instead of rescanning.
+
+    Filtered queries narrow the candidate rows with vectorized masks over
+    the camera and timestamp columns before any scoring.
+
+    A VectorCodec selects the storage encoding (float32 by default; float16,
+    int8 or product quantization to cut memory 2x to ~64x). Queries score
+    the stored codes directly. Codecs that need training (PQ) stage raw
+    float32 rows, committed like any other column, until train_size entries
+    have arrived; only then are they fit and encoded.
     """
-    def __init__(self, index_dir: str = "./search_index"):
+    def __init__(
+        self,
+        index_dir: str = "./search_index",
+        persist: bool = True,
+        flush_every: int = 256,
+        query_chunk_size: int = 65536,
+        ann_index: Optional[IVFIndex] = None,
+        ann_min_rows: int = 20000,
+        preprocess_workers: int = 4,
+        ingest_batch_size: int = 32,
+        ingest_latency: float = 0.05,
+        frame_gate: Optional[FrameGate] = None,
+        text_cache_size: int = 256,
+        codec: Optional[VectorCodec] = None,
+    ):
         self.index_dir = Path(index_dir)
         self.index_dir.mkdir(parents=True, exist_ok=True)
-        
-        self.embeddings: Dict[str, np.ndarray] = {}
-        self.metadata: Dict[str, Dict[str, Any]] = {}
-        self.embedding_matrix: Optional[np.ndarray] = None
-        self.entry_ids: List[str] = []
-        
+        self.persist = persist
+        self.flush_every = flush_every
+        self.query_chunk_size = query_chunk_size
+        self.ann_min_rows = ann_min_rows
+        self.ingest_batch_size = ingest_batch_size
+        self.ingest_latency = ingest_latency
+        self.frame_gate = frame_gate
+        self.text_cache_size = text_cache_size
+        self.codec = codec or VectorCodec()
+        self._codec_configured = codec is not None
+
+        # Columns are created on the first embedding, once the dimension is known
+        self._data = _IndexData(self.index_dir if persist else None)
+        self._next_row_id = 0
+        self._pending = 0
+        self._compact_lock = threading.Lock()
+
+        # Approximate search backend
+        self._ann = ann_index
+        self._ann_trained_rows = 0
+        self._ann_thread: Optional[threading.Thread] = None
+
+        # Batched ingestion
+        self._preprocess_pool = ThreadPoolExecutor(max_workers=preprocess_workers, thread_name_prefix="sentinel-preprocess")
+        self._ingestor: Optional[MicroBatcher] = None
+
+        # Query acceleration
+        self._text_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._text_lock = threading.Lock()
+        self.saved_searches: Dict[str, SavedSearch] = {}
+        self._saved_matrix: Optional[np.ndarray] = None
+
         self.lock = threading.Lock()
         self._model = None
         self._preprocess = None
-        self._device = HardwareAccelerator.get_device()
-        
-        self._load_index()
+        self._device: Optional[str] = None  # Resolved with the model, so index/search need no torch
+
+        if self.persist:
+            self._load_index()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    @property
+    def embedding_matrix(self) -> Optional[np.ndarray]:
+        """(N, D) float32 view of all indexed embeddings; compressed rows decode on access."""
+        return self._float_view(self._data)
+
+    def _float_view(self, data: _IndexData, start: int = 0, stop: Optional[int] = None) -> Optional[np.ndarray]:
+        """Float32 view of rows [start, stop); compressed rows are only decoded when indexed."""
+        if data.store is None:
+            return data.staging.view[start:stop] if data.staging is not None else None
+        if self.codec.name == VectorCodec.name:
+            return data.store.view[start:stop]
+        return DecodedMatrix(data.store.view[start:stop], self.codec)
+
+    def _add_to_ann(self, ann: IVFIndex, matrix: np.ndarray):
+        """Assign rows to the ANN in chunks, so compressed stores never decode in full."""
+        chunk = DECODE_CHUNK_ROWS if isinstance(matrix, DecodedMatrix) else self.query_chunk_size
+        for start in range(0, len(matrix), chunk):
+            ann.add(matrix[start:start + chunk])
+
+    def _snapshot(self) -> _Snapshot:
+        """Caller holds the lock."""
+        data = self._data
+        return _Snapshot(
+            matrix=data.vectors.view,
+            codec=self.codec if data.store is not None else None,
+            cameras=data.cameras.view,
+            times=data.times.view,
+            row_ids=data.row_ids.view,
+            extras=data.extras,
+            time_sorted=data.time_sorted,
+            ann=self._ann,
+        )
+
+    def get_storage_stats(self) -> Dict[str, Any]:
+        """Embedding and column memory footprint under the active codec."""
+        with self.lock:
+            data = self._data
+            count = len(data)
+            dim = data.staging.row_shape[0] if data.staging is not None else (data.dim or 0)
+            stored = data.vectors.nbytes if data.vectors is not None else 0
+            columns = sum(c.nbytes for c in (data.cameras, data.times, data.row_ids) if c is not None)
+            extras = len(data.extras)
+        float_bytes = count * dim * 4
+        return {
+            "codec": self.codec.name,
+            "entries": count,
+            "bytes": stored,
+            "bytes_per_vector": self.codec.bytes_per_vector(dim) if dim else 0,
+            "float32_bytes": float_bytes,
+            "compression": float_bytes / stored if stored else 1.0,
+            "column_bytes": columns,
+            "entries_with_extras": extras,
+            "staged": len(data.staging) if data.staging is not None else 0,
+        }
 
     def _ensure_model(self):
         """Lazy load the vision-language model."""
@@ -52,8 +386,9 @@ class SemanticEngine:
             return
 
         try:
-            import torch
             import clip
+            from core.accelerator import HardwareAccelerator
+            self._device = HardwareAccelerator.get_device()
             logger.info(f"Loading Semantic Intelligence Model ({DEFAULT_MODEL}) on {self._device}...")
             self._model, self._preprocess = clip.load(DEFAULT_MODEL, device=self._device)
             HardwareAccelerator.optimize_model(self._model)
@@ -62,59 +397,551 @@ class SemanticEngine:
             raise
 
     def _load_index(self):
-        """Load sovereign embeddings from persistent storage."""
+        """Open the sovereign index from persistent storage."""
+        manifest_file = self.index_dir / MANIFEST_FILE
+        if not manifest_file.exists():
+            # Nothing was ever committed; any log is leftover
+            (self.index_dir / EXTRAS_LOG).unlink(missing_ok=True)
+            (self.index_dir / METADATA_LOG).unlink(missing_ok=True)
+            self._migrate_legacy_index()
+            return
+
+        try:
+            with open(manifest_file, 'r') as f:
+                manifest = json.load(f)
+            staged = manifest.get('staged', False)
+            self._restore_codec(manifest.get('codec', {"name": VectorCodec.name}), trained=not staged)
+            if manifest.get('format', 1) < 2:
+                self._upgrade_index(manifest)
+            else:
+                count = manifest['count']
+                data = _IndexData(self.index_dir, manifest['generation'])
+                # Embeddings are mapped, not read: pages load on demand
+                if staged:
+                    data.open_staging(manifest['dim'], size=count)
+                else:
+                    data.open_store(self.codec, manifest['dim'], size=count)
+                    # Left behind if training committed but the process died before cleanup
+                    data.path(STAGING_COLUMN).unlink(missing_ok=True)
+                data.open_columns(size=count)
+                data.load_extras(manifest['next_row_id'])
+                self._data = data
+                self._next_row_id = manifest['next_row_id']
+
+            # Files of a compaction that never got published
+            self._remove_generations(keep=self._data.generation)
+            logger.info(f"Sovereign Index loaded: {len(self)} entries.")
+            if self._ann is not None:
+                self._maybe_retrain_ann()
+        except Exception as e:
+            # Serve from memory rather than append to an index we cannot read
+            logger.error(f"Index restoration failure: {e}. Persistence disabled for this session.")
+            self.persist = False
+            self._data = _IndexData(None)
+            self._next_row_id = 0
+
+    def _restore_codec(self, config: Dict[str, Any], trained: bool = True):
+        """Adopt the codec the index was written with."""
+        if config != self.codec.config():
+            if self._codec_configured:
+                logger.warning(f"Index stored with codec {config}; ignoring configured {self.codec.config()}.")
+            self.codec = codec_from_config(config)
+        if self.codec.requires_training and trained:
+            self.codec.load_state(np.load(self.index_dir / CODEC_STATE))
+
+    def _upgrade_index(self, manifest: Dict[str, Any]):
+        """Convert a format 1 index (string ids, full metadata log) to columnar metadata."""
+        count = manifest['count']
+        for name in (CAMERA_COLUMN, TIME_COLUMN, ROW_ID_COLUMN, EXTRAS_LOG):
+            (self.index_dir / name).unlink(missing_ok=True)
+
+        data = _IndexData(self.index_dir)
+        data.open_store(self.codec, manifest['dim'], size=count)
+        data.open_columns(capacity=max(count, 1))
+        with open(self.index_dir / METADATA_LOG, 'r') as f:
+            for row_id in range(count):
+                record = json.loads(f.readline())
+                record.pop('id', None)
+                data.cameras.append(record.pop('camera_id'))
+                data.times.append(datetime.fromisoformat(record.pop('timestamp')).timestamp())
+                data.row_ids.append(row_id)
+                if record:
+                    data.add_extra(row_id, record)
+        times = data.times.view
+        data.time_sorted = bool(np.all(times[1:] >= times[:-1]))
+
+        self._data = data
+        self._next_row_id = count
+        with self.lock:
+            self._commit()
+        (self.index_dir / METADATA_LOG).unlink()
+        logger.info(f"Sovereign Index upgraded to format {INDEX_FORMAT}: {count} entries.")
+
+    def _remove_generations(self, keep: int):
+        """Delete index files that belong to any generation but keep."""
+        for path in self.index_dir.iterdir():
+            name, generation = path.name, 0
+            if name not in GENERATION_FILES:
+                base, _, suffix = name.rpartition('.')
+                if base not in GENERATION_FILES or not suffix.isdigit():
+                    continue
+                generation = int(suffix)
+            if generation != keep:
+                path.unlink(missing_ok=True)
+
+    def _train_codec(self):
+        """Fit the codec on the staged rows and move them into the encoded store. Caller holds the lock."""
+        data = self._data
+        staged = data.staging.view
+        self.codec.train(staged)
+
+        data.open_store(self.codec, staged.shape[1], capacity=max(len(staged), 1024))
+        for start in range(0, len(staged), self.query_chunk_size):
+            data.store.extend(self.codec.encode(staged[start:start + self.query_chunk_size]))
+        if self.persist:
+            if self.codec.state() is not None:
+                np.save(self.index_dir / CODEC_STATE, self.codec.state())
+            # The manifest must point at the encoded store before the staged rows go
+            self._commit()
+        data.drop_staging()
+
+    def _migrate_legacy_index(self):
+        """Convert a monolithic embeddings.npy/index_metadata.json snapshot to the append-only layout."""
         meta_file = self.index_dir / "index_metadata.json"
         matrix_file = self.index_dir / "embeddings.npy"
-        
+
         if meta_file.exists() and matrix_file.exists():
             try:
                 with open(meta_file, 'r') as f:
                     data = json.load(f)
-                self.metadata = data['metadata']
-                self.entry_ids = data['entry_ids']
-                self.embedding_matrix = np.load(matrix_file)
-                logger.info(f"Sovereign Index loaded: {len(self.entry_ids)} entries.")
+                matrix = np.load(matrix_file).astype(np.float32, copy=False)
+                for entry_id, embedding in zip(data['entry_ids'], matrix):
+                    meta = dict(data['metadata'][entry_id])
+                    camera_id = meta.pop('camera_id')
+                    timestamp = datetime.fromisoformat(meta.pop('timestamp')).timestamp()
+                    self._append_entry(embedding, camera_id, timestamp, meta)
+                self.flush()
+                logger.info(f"Sovereign Index migrated: {len(self)} entries.")
             except Exception as e:
                 logger.error(f"Index restoration failure: {e}")
 
-    def index(self, frame: np.ndarray, camera_id: int, metadata: Optional[Dict[str, Any]] = None):
+    def _append_entry(
+        self, embedding: np.ndarray, camera_id: int, timestamp: float, extra: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """Record one entry and return its row id. Caller holds the lock (or owns the engine exclusively)."""
+        data = self._data
+        row_id = self._next_row_id
+        # Serialize first: unencodable metadata must fail before any column is appended
+        record = json.dumps({"row": row_id, **extra}) if extra else None
+        if data.vectors is None:
+            # An incompatible codec must fail now, not once train_size rows are staged
+            self.codec.check_dim(embedding.shape[0])
+
+        if data.cameras is None:
+            data.open_columns()
+
+        if len(data) and timestamp < data.times.view[-1]:
+            data.time_sorted = False
+
+        if self.codec.is_trained:
+            if data.store is None:
+                data.open_store(self.codec, embedding.shape[0])
+            data.store.append(self.codec.encode(embedding.reshape(1, -1))[0])
+        else:
+            if data.staging is None:
+                data.open_staging(embedding.shape[0])
+            data.staging.append(embedding)
+
+        self._next_row_id += 1
+        data.cameras.append(camera_id)
+        data.times.append(timestamp)
+        data.row_ids.append(row_id)
+        if extra:
+            data.add_extra(row_id, extra, record)
+
+        if self._ann is not None:
+            if self._ann.is_trained and self._ann.size == len(data) - 1:
+                self._ann.add(embedding.reshape(1, -1))
+            self._maybe_retrain_ann()
+
+        if data.staging is not None and len(data.staging) >= getattr(self.codec, "train_size", 0):
+            self._train_codec()
+
+        if self.persist:
+            self._pending += 1
+            if self._pending >= self.flush_every:
+                self._commit()
+        return row_id
+
+    def _maybe_retrain_ann(self):
+        """Start background (re)training when the index has outgrown the current centroids."""
+        n = len(self)
+        if self._ann is None or n < self.ann_min_rows or n < 2 * self._ann_trained_rows:
+            return
+        if self._ann_thread is not None and self._ann_thread.is_alive():
+            return
+
+        self._ann_trained_rows = n
+        self._ann_thread = threading.Thread(
+            target=self._retrain_ann, args=(n, self._data), name="sentinel-ann-train", daemon=True
+        )
+        self._ann_thread.start()
+
+    def _retrain_ann(self, n: int, data: _IndexData):
+        """Train a fresh IVF index on the first n rows, then swap it in."""
+        try:
+            ann = self._ann.clone()
+            # train() gathers (and so decodes) only its sample rows
+            matrix = self._float_view(data, stop=n)
+            ann.train(matrix)
+            self._add_to_ann(ann, matrix)
+
+            with self.lock:
+                if self._data is not data:
+                    # Compaction renumbered the rows meanwhile; retry on the next append
+                    self._ann_trained_rows = 0
+                    return
+                # Catch up on rows appended while training
+                self._add_to_ann(ann, self._float_view(data, start=ann.size))
+                self._ann = ann
+            logger.info(f"Approximate index refreshed: {ann.size} entries.")
+        except Exception as e:
+            logger.error(f"Approximate index training failure: {e}")
+
+    def _commit(self):
+        """Make appended entries durable, then publish the new count."""
+        data = self._data
+        if data.vectors is None:
+            return
+
+        data.flush()
+        manifest = {
+            "format": INDEX_FORMAT,
+            "dim": data.dim,
+            "count": len(data),
+            "next_row_id": self._next_row_id,
+            "generation": data.generation,
+            "codec": self.codec.config(),
+            "staged": data.store is None,
+        }
+        tmp_file = self.index_dir / (MANIFEST_FILE + ".tmp")
+        with open(tmp_file, 'w') as f:
+            json.dump(manifest, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.index_dir / MANIFEST_FILE)
+        self._pending = 0
+
+    def flush(self):
+        """Commit all pending entries to persistent storage."""
+        if not self.persist:
+            return
+        with self.lock:
+            self._commit()
+
+    def close(self):
+        """Flush and release index files."""
+        self._preprocess_pool.shutdown(wait=True)
+        self.flush()
+        self._data.close()
+
+    def apply_retention(self, days: float) -> int:
+        """Drop entries older than the given number of days. Returns the number removed."""
+        return self.compact(before=time.time() - days * 86400)
+
+    def compact(self, before: TimeBound) -> int:
+        """
+        Drop entries timestamped before the cutoff and rewrite the index.
+        Surviving rows are copied to a new generation without holding the
+        lock, so queries and ingestion continue; rows appended meanwhile are
+        carried over at the swap. Returns the number of entries removed.
+        """
+        cutoff = _epoch(before)
+        with self._compact_lock:
+            with self.lock:
+                old = self._data
+                n = len(old)
+                if n == 0:
+                    return 0
+                if old.time_sorted:
+                    keep = np.arange(np.searchsorted(old.times.view, cutoff, side='left'), n)
+                else:
+                    keep = np.flatnonzero(old.times.view >= cutoff)
+                if len(keep) == n:
+                    return 0
+                staged = old.store is None
+                if staged:
+                    # Staged rows are bounded by the codec's train_size
+                    new = self._rewrite(old, keep, n)
+                    self._swap(new, keep, n)
+
+            if not staged:
+                new = self._rewrite(old, keep, n)
+                with self.lock:
+                    self._swap(new, keep, n)
+
+            old.close()
+            if self.persist:
+                self._remove_generations(keep=new.generation)
+        logger.info(f"Index compacted: {n - len(keep)} entries removed, {len(self)} retained.")
+        return n - len(keep)
+
+    def _rewrite(self, old: _IndexData, keep: np.ndarray, n: int) -> _IndexData:
+        """Copy the kept rows (among the first n) into a fresh generation."""
+        new = _IndexData(old.directory, old.generation + 1)
+        capacity = max(len(keep), 1024)
+        new.open_columns(capacity=capacity)
+        if old.store is not None:
+            new.open_store(self.codec, old.dim, capacity=capacity)
+        else:
+            new.open_staging(old.dim, capacity=capacity)
+
+        for start in range(0, len(keep), self.query_chunk_size):
+            chunk = keep[start:start + self.query_chunk_size]
+            new.vectors.extend(old.vectors.view[chunk])
+            new.cameras.extend(old.cameras.view[chunk])
+            new.times.extend(old.times.view[chunk])
+            new.row_ids.extend(old.row_ids.view[chunk])
+
+        kept_ids = new.row_ids.view
+        for row_id, extra in list(old.extras.items()):
+            position = np.searchsorted(kept_ids, row_id)
+            if position < len(kept_ids) and kept_ids[position] == row_id:
+                new.add_extra(row_id, extra)
+        return new
+
+    def _swap(self, new: _IndexData, keep: np.ndarray, n: int):
+        """Carry over rows appended since the rewrite began and install the new generation. Caller holds the lock."""
+        old = self._data
+        tail = slice(n, len(old))
+        new.vectors.extend(old.vectors.view[tail])
+        new.cameras.extend(old.cameras.view[tail])
+        new.times.extend(old.times.view[tail])
+        new.row_ids.extend(old.row_ids.view[tail])
+        for row_id in old.row_ids.view[tail].tolist():
+            if row_id in old.extras:
+                new.add_extra(row_id, old.extras[row_id])
+        times = new.times.view
+        new.time_sorted = bool(np.all(times[1:] >= times[:-1]))
+
+        # Renumber the approximate index instead of retraining it
+        if self._ann is not None and self._ann.is_trained:
+            mapping = np.full(len(old), -1, dtype=np.int64)
+            mapping[keep] = np.arange(len(keep))
+            mapping[n:] = np.arange(len(keep), len(new))
+            self._ann = self._ann.remapped(mapping)
+        self._ann_trained_rows = min(self._ann_trained_rows, len(new))
+
+        self._data = new
+        if self.persist:
+            self._commit()
+
+    def _preprocess_frame(self, frame: np.ndarray):
+        from PIL import Image
+
+        pil_img = Image.fromarray(frame[:, :, ::-1]) # BGR to RGB
+        return self._preprocess(pil_img)
+
+    def index(self, frame: np.ndarray, camera_id: int, metadata: Optional[Dict[str, Any]] = None) -> Optional[str]:
         """
         Ingest and index a frame into the semantic memory.
         """
+        return self.index_batch([frame], [camera_id], [metadata])[0]
+
+    def index_batch(
+        self,
+        frames: List[np.ndarray],
+        camera_ids: List[int],
+        metadata: Optional[List[Optional[Dict[str, Any]]]] = None,
+    ) -> List[Optional[str]]:
+        """
+        Ingest several frames (from any cameras) with a single encoder pass.
+        Returns the entry ids in input order (None for gated frames).
+        """
+        entry_ids: List[Optional[str]] = [None] * len(frames)
+        metadata = metadata or [None] * len(frames)
+
+        # Near-duplicates never reach the encoder
+        admitted = list(range(len(frames)))
+        if self.frame_gate is not None:
+            admitted = [i for i in admitted if self.frame_gate.admit_frame(camera_ids[i], frames[i])]
+        if not admitted:
+            return entry_ids
+
         self._ensure_model()
         import torch
-        from PIL import Image
 
-        # Preprocessing
-        pil_img = Image.fromarray(frame[:, :, ::-1]) # BGR to RGB
-        img_input = self._preprocess(pil_img).unsqueeze(0).to(self._device)
+        # Preprocessing fans out across the thread pool
+        tensors = self._preprocess_pool.map(self._preprocess_frame, [frames[i] for i in admitted])
+        img_input = torch.stack(list(tensors)).to(self._device)
 
         with torch.no_grad():
             features = self._model.encode_image(img_input)
             features /= features.norm(dim=-1, keepdim=True)
-            embedding = features.cpu().numpy().flatten()
+            embeddings = features.cpu().numpy().astype(np.float32, copy=False)
 
-        entry_id = f"unit{camera_id}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
-        
+        indexed = []
         with self.lock:
-            self.entry_ids.append(entry_id)
-            self.metadata[entry_id] = {
-                "camera_id": camera_id,
-                "timestamp": datetime.now().isoformat(),
-                **(metadata or {})
-            }
-            
-            if self.embedding_matrix is None:
-                self.embedding_matrix = embedding.reshape(1, -1)
-            else:
-                self.embedding_matrix = np.vstack([self.embedding_matrix, embedding])
+            for i, embedding in zip(admitted, embeddings):
+                camera_id = camera_ids[i]
+                if self.frame_gate is not None and not self.frame_gate.admit_embedding(camera_id, embedding):
+                    continue
+
+                now = datetime.now()
+                extra = dict(metadata[i]) if metadata[i] else None
+                row_id = self._append_entry(embedding, camera_id, now.timestamp(), extra)
+                entry_ids[i] = _entry_id(row_id, camera_id, now)
+                indexed.append((row_id, camera_id, now, extra, embedding))
+
+        if indexed and self.saved_searches:
+            self._match_saved_searches(indexed)
+        return entry_ids
 
-    def query(self, text: str, top_k: int = 5) -> List[SemanticResult]:
+    def _index_items(self, items: List[Tuple[np.ndarray, int, Optional[Dict[str, Any]]]]) -> List[Optional[str]]:
+        frames, camera_ids, metadata = zip(*items)
+        return self.index_batch(list(frames), list(camera_ids), list(metadata))
+
+    async def index_async(self, frame: np.ndarray, camera_id: int, metadata: Optional[Dict[str, Any]] = None) -> Optional[str]:
         """
-        Execute a natural language query against the semantic index.
+        Queue a frame for batched ingestion. Frames submitted concurrently
+        (e.g. from many camera callbacks) are encoded together.
         """
-        if not self.entry_ids: return []
-        
+        if self._ingestor is None:
+            self._ingestor = MicroBatcher(
+                self._index_items,
+                max_batch_size=self.ingest_batch_size,
+                max_latency=self.ingest_latency,
+                name="semantic-ingest",
+            )
+        return await self._ingestor.submit((frame, camera_id, metadata))
+
+    async def stop_ingestion(self):
+        """Stop the batched ingestion queue; frames still queued are discarded."""
+        if self._ingestor is not None:
+            await self._ingestor.close()
+            self._ingestor = None
+
+    def _search(
+        self,
+        matrix: np.ndarray,
+        query_emb: np.ndarray,
+        top_k: int,
+        ann: Optional[IVFIndex] = None,
+        n_probe: Optional[int] = None,
+        rows: Optional[np.ndarray] = None,
+        codec: Optional[VectorCodec] = None,
+    ):
+        """
+        Top-k rows of matrix by similarity: approximate where covered, exact elsewhere.
+        rows (ascending) restricts the search to a pre-filtered subset. With a
+        codec, matrix holds its codes and is scored without decoding.
+        """
+        prepared = codec.prepare(query_emb) if codec is not None else query_emb
+        if rows is not None:
+            return self._search_subset(matrix, query_emb, prepared, top_k, ann, n_probe, rows, codec)
+        if ann is None or not ann.is_trained:
+            return top_k_search(matrix, prepared, top_k, self.query_chunk_size, codec)
+
+        rows, scores = ann.search(matrix, query_emb, top_k, n_probe, codec, prepared)
+        if ann.size < len(matrix):
+            tail_rows, tail_scores = top_k_search(matrix[ann.size:], prepared, top_k, self.query_chunk_size, codec)
+            rows, scores = merge_top_k(rows, scores, tail_rows + ann.size, tail_scores, top_k)
+        return rows, scores
+
+    def _search_subset(
+        self,
+        matrix: np.ndarray,
+        query_emb: np.ndarray,
+        prepared: Any,
+        top_k: int,
+        ann: Optional[IVFIndex],
+        n_probe: Optional[int],
+        rows: np.ndarray,
+        codec: Optional[VectorCodec],
+    ):
+        # Small subsets are cheaper to scan exactly than to probe
+        if ann is None or not ann.is_trained or len(rows) < self.ann_min_rows:
+            return top_k_search_rows(matrix, rows, prepared, top_k, self.query_chunk_size, codec)
+
+        covered = rows[:np.searchsorted(rows, ann.size)]
+        candidates = ann.candidates(query_emb, n_probe)
+        candidates = candidates[np.isin(candidates, covered, assume_unique=True)]
+
+        # Uncovered tail rows are scored exactly alongside the probed candidates
+        candidates = np.concatenate([candidates, rows[len(covered):]])
+        return top_k_search_rows(matrix, candidates, prepared, top_k, self.query_chunk_size, codec)
+
+    def _filter_rows(
+        self,
+        snap: _Snapshot,
+        camera_ids: Optional[Union[int, Iterable[int]]] = None,
+        start: Optional[TimeBound] = None,
+        end: Optional[TimeBound] = None,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> Optional[np.ndarray]:
+        """
+        Ascending rows of the snapshot that pass the filters, or None when unfiltered.
+        Time and camera filters are vectorized over the columns; metadata keys
+        are then checked against the sparse extras of the surviving rows.
+        The camera_id and timestamp keys of result metadata live in the columns,
+        so where-clauses on them are applied as camera and time filters.
+        """
+        if where and not where.keys().isdisjoint(RESERVED_KEYS):
+            camera_ids, start, end, where = _route_reserved(where, camera_ids, start, end)
+
+        if camera_ids is None and start is None and end is None and not where:
+            return None
+
+        n = len(snap.matrix)
+        times = snap.times
+
+        # Time range: a contiguous row span when appends arrived in time order
+        lo, hi = 0, n
+        mask = None
+        if snap.time_sorted:
+            if start is not None:
+                lo = int(np.searchsorted(times, _epoch(start), side='left'))
+            if end is not None:
+                hi = int(np.searchsorted(times, _epoch(end), side='right'))
+            hi = max(lo, hi)
+        elif start is not None or end is not None:
+            mask = np.ones(n, dtype=bool)
+            if start is not None:
+                mask &= times >= _epoch(start)
+            if end is not None:
+                mask &= times <= _epoch(end)
+
+        if camera_ids is not None:
+            wanted = np.asarray([camera_ids] if isinstance(camera_ids, numbers.Integral) else list(camera_ids), dtype=np.int64)
+            camera_mask = np.isin(snap.cameras[lo:hi], wanted)
+            mask = camera_mask if mask is None else mask[lo:hi] & camera_mask
+        elif mask is not None:
+            mask = mask[lo:hi]
+
+        rows = np.arange(lo, hi, dtype=np.intp) if mask is None else np.flatnonzero(mask) + lo
+
+        if where:
+            def matches(extra: Dict[str, Any]) -> bool:
+                return all(extra.get(key) == value for key, value in where.items())
+
+            row_ids = snap.row_ids[rows]
+            extras = snap.extras
+            if len(extras) < len(rows):
+                # Fewer tagged entries than candidates: scan the tags instead
+                wanted = np.fromiter((rid for rid, extra in list(extras.items()) if matches(extra)), dtype=np.int64)
+                rows = rows[np.isin(row_ids, wanted)]
+            else:
+                rows = rows[np.fromiter((matches(extras.get(rid, {})) for rid in row_ids.tolist()), dtype=bool, count=len(rows))]
+        return rows
+
+    def _encode_text(self, text: str) -> np.ndarray:
+        """Normalized text embedding, served from the LRU cache when possible."""
+        with self._text_lock:
+            cached = self._text_cache.get(text)
+            if cached is not None:
+                self._text_cache.move_to_end(text)
+                return cached
+
         self._ensure_model()
         import torch
         import clip
@@ -123,21 +950,127 @@ class SemanticEngine:
         with torch.no_grad():
             text_features = self._model.encode_text(tokens)
             text_features /= text_features.norm(dim=-1, keepdim=True)
-            query_emb = text_features.cpu().numpy().flatten()
+            query_emb = text_features.cpu().numpy().flatten().astype(np.float32)
+
+        with self._text_lock:
+            self._text_cache[text] = query_emb
+            while len(self._text_cache) > self.text_cache_size:
+                self._text_cache.popitem(last=False)
+        return query_emb
+
+    def _result(
+        self, row_id: int, camera_id: int, timestamp: datetime, extra: Optional[Dict[str, Any]], score: float
+    ) -> SemanticResult:
+        return SemanticResult(
+            id=_entry_id(row_id, camera_id, timestamp),
+            camera_id=camera_id,
+            timestamp=timestamp,
+            similarity=float(score),
+            metadata={"camera_id": camera_id, "timestamp": timestamp.isoformat(), **(extra or {})},
+            row_id=row_id,
+        )
+
+    def _results(self, snap: _Snapshot, rows: np.ndarray, scores: np.ndarray) -> List[SemanticResult]:
+        """Result objects for the given snapshot rows only."""
+        return [
+            self._result(row_id, camera_id, datetime.fromtimestamp(timestamp), snap.extras.get(row_id), score)
+            for row_id, camera_id, timestamp, score in zip(
+                snap.row_ids[rows].tolist(), snap.cameras[rows].tolist(), snap.times[rows].tolist(), scores.tolist()
+            )
+        ]
+
+    def register_saved_search(
+        self,
+        name: str,
+        text: str,
+        threshold: float = 0.25,
+        max_matches: int = 1000,
+        callback: Optional[Callable[[SavedSearch, SemanticResult], None]] = None,
+        backfill: bool = True,
+    ) -> SavedSearch:
+        """
+        Register a standing query. With backfill, existing entries above the
+        threshold are matched once up front.
+        """
+        search = SavedSearch(name, text, self._encode_text(text), threshold, max_matches, callback)
+
+        if backfill and len(self):
+            with self.lock:
+                snap = self._snapshot()
+            rows, scores = self._search(snap.matrix, search.embedding, max_matches, codec=snap.codec)
+            hit = scores >= threshold
+            # Keep arrival order so the deque retains the newest matches
+            order = np.argsort(rows[hit], kind="stable")
+            search.matches.extend(self._results(snap, rows[hit][order], scores[hit][order]))
+
+        with self.lock:
+            self.saved_searches[name] = search
+            self._saved_matrix = np.stack([s.embedding for s in self.saved_searches.values()])
+        return search
+
+    def remove_saved_search(self, name: str):
+        with self.lock:
+            self.saved_searches.pop(name, None)
+            self._saved_matrix = (
+                np.stack([s.embedding for s in self.saved_searches.values()]) if self.saved_searches else None
+            )
+
+    def _match_saved_searches(self, indexed: List[Tuple[int, int, datetime, Optional[Dict[str, Any]], np.ndarray]]):
+        """Score freshly indexed entries against every saved search in one product."""
+        with self.lock:
+            searches = list(self.saved_searches.values())
+            saved_matrix = self._saved_matrix
+        if saved_matrix is None:
+            return
+
+        scores = np.stack([entry[-1] for entry in indexed]) @ saved_matrix.T
+        for row, col in zip(*np.nonzero(scores >= np.array([s.threshold for s in searches]))):
+            search = searches[col]
+            result = self._result(*indexed[row][:4], scores[row, col])
+            search.matches.append(result)
+            if search.callback is not None:
+                try:
+                    search.callback(search, result)
+                except Exception as e:
+                    logger.error(f"Saved search callback failure [{search.name}]: {e}")
 
-        # Compute similarities via dot product
-        similarities = np.dot(self.embedding_matrix, query_emb)
+    def saved_search_results(self, name: str, top_k: Optional[int] = None) -> List[SemanticResult]:
+        """Matches of a saved search, best first."""
+        results = sorted(self.saved_searches[name].matches, key=lambda r: r.similarity, reverse=True)
+        return results[:top_k] if top_k else results
+
+    def query(
+        self,
+        text: str,
+        top_k: int = 5,
+        exact: bool = False,
+        n_probe: Optional[int] = None,
+        camera_ids: Optional[Union[int, Iterable[int]]] = None,
+        start: Optional[TimeBound] = None,
+        end: Optional[TimeBound] = None,
+        where: Optional[Dict[str, Any]] = None,
+    ) -> List[SemanticResult]:
+        """
+        Execute a natural language query against the semantic index.
+        Uses the approximate index when one is trained, unless exact=True.
+
+        Results can be restricted to one or more cameras, an inclusive time
+        range (datetime or epoch seconds) and exact metadata values (where).
+        """
+        if not len(self): return []
         
-        results = []
-        for idx, entry_id in enumerate(self.entry_ids):
-            meta = self.metadata[entry_id]
-            results.append(SemanticResult(
-                id=entry_id,
-                camera_id=meta['camera_id'],
-                timestamp=datetime.fromisoformat(meta['timestamp']),
-                similarity=float(similarities[idx]),
-                metadata=meta
-            ))
-
-        results.sort(key=lambda x: x.similarity, reverse=True)
-        return results[:top_k]
+        query_emb = self._encode_text(text)
+
+        # Snapshot: concurrent appends and compaction may replace the store while we score
+        with self.lock:
+            snap = self._snapshot()
+
+        rows = self._filter_rows(snap, camera_ids, start, end, where)
+        if rows is not None and len(rows) == 0:
+            return []
+
+        ann = snap.ann if not exact else None
+        rows, scores = self._search(snap.matrix, query_emb, top_k, ann, n_probe, rows, snap.codec)
+
+        # Result objects are built for the winners only
+        return self._results(snap, rows, scores)
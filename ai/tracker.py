@@ -0,0 +1,169 @@
+import numpy as np
+from typing import List, Tuple, Union
+from ai.base import Detection, DetectionBatch
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU between Nx4 and Mx4 (x1, y1, x2, y2) boxes."""
+    a = a.astype(np.float32, copy=False)
+    b = b.astype(np.float32, copy=False)
+
+    # In-place arithmetic keeps the N x M temporaries to a minimum
+    w = np.minimum(a[:, None, 2], b[None, :, 2])
+    w -= np.maximum(a[:, None, 0], b[None, :, 0])
+    np.maximum(w, 0, out=w)
+    h = np.minimum(a[:, None, 3], b[None, :, 3])
+    h -= np.maximum(a[:, None, 1], b[None, :, 1])
+    np.maximum(h, 0, out=h)
+    inter = np.multiply(w, h, out=w)
+
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = np.add(area_a[:, None], area_b[None, :], out=h)
+    union -= inter
+    np.maximum(union, 1e-12, out=union)
+    return np.divide(inter, union, out=inter)
+
+def greedy_match(scores: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Highest-score-first one-to-one assignment of rows to columns above threshold."""
+    rows, cols = np.nonzero(scores >= threshold)
+    if len(rows) == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+    order = np.argsort(-scores[rows, cols], kind="stable")
+    used_rows = np.zeros(scores.shape[0], dtype=bool)
+    used_cols = np.zeros(scores.shape[1], dtype=bool)
+    matched_rows, matched_cols = [], []
+
+    # Only candidate pairs are visited; crowded scenes stay sparse at useful thresholds
+    for r, c in zip(rows[order].tolist(), cols[order].tolist()):
+        if used_rows[r] or used_cols[c]:
+            continue
+        used_rows[r] = used_cols[c] = True
+        matched_rows.append(r)
+        matched_cols.append(c)
+
+    return np.asarray(matched_rows, dtype=np.intp), np.asarray(matched_cols, dtype=np.intp)
+
+class ObjectTracker:
+    """
+    Lightweight CPU multi-object tracker (ByteTrack/SORT style).
+    Assigns stable track ids by associating detections with constant-velocity
+    track predictions via IoU. High-confidence detections are matched first;
+    low-confidence ones can only extend existing tracks.
+
+    Intended to sit between ``YOLODetector.detect`` and ``ZoneEngine.process``.
+    One tracker instance serves one camera.
+    """
+    def __init__(
+        self,
+        high_threshold: float = 0.5,
+        low_threshold: float = 0.1,
+        match_iou: float = 0.3,
+        max_age: int = 30,
+        velocity_smoothing: float = 0.5,
+    ):
+        self.high_threshold = high_threshold
+        self.low_threshold = low_threshold
+        self.match_iou = match_iou
+        self.max_age = max_age
+        self.velocity_smoothing = velocity_smoothing
+        self.reset()
+
+    def reset(self):
+        """Forget all tracks."""
+        self.boxes = np.empty((0, 4), dtype=np.float64)
+        self.velocities = np.empty((0, 4), dtype=np.float64)
+        self.track_ids = np.empty(0, dtype=np.int64)
+        self.class_ids = np.empty(0, dtype=np.int32)
+        self.misses = np.empty(0, dtype=np.int32)
+        self._next_id = 1
+
+    def __len__(self) -> int:
+        return len(self.track_ids)
+
+    def update(self, detections: Union[List[Detection], DetectionBatch]) -> Union[List[Detection], DetectionBatch]:
+        """Associate a frame's detections with live tracks and set their track_id in place."""
+        if isinstance(detections, DetectionBatch):
+            detections.track_ids = self._associate(
+                detections.bboxes.astype(np.float64), detections.class_ids, detections.confidences
+            )
+            return detections
+
+        n = len(detections)
+        bboxes = np.array([d.bbox for d in detections], dtype=np.float64).reshape(n, 4)
+        class_ids = np.fromiter((d.class_id for d in detections), dtype=np.int32, count=n)
+        confidences = np.fromiter((d.confidence for d in detections), dtype=np.float32, count=n)
+
+        assigned = self._associate(bboxes, class_ids, confidences).tolist()
+        for detection, track_id in zip(detections, assigned):
+            detection.track_id = None if track_id == DetectionBatch.NO_TRACK else track_id
+        return detections
+
+    def _match(
+        self,
+        det_idx: np.ndarray,
+        trk_idx: np.ndarray,
+        bboxes: np.ndarray,
+        class_ids: np.ndarray,
+        predicted: np.ndarray,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        if len(det_idx) == 0 or len(trk_idx) == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp)
+
+        scores = iou_matrix(bboxes[det_idx], predicted[trk_idx])
+        # Class gating: tracks never switch class
+        scores[class_ids[det_idx][:, None] != self.class_ids[trk_idx][None, :]] = 0.0
+        rows, cols = greedy_match(scores, self.match_iou)
+        return det_idx[rows], trk_idx[cols]
+
+    def _associate(self, bboxes: np.ndarray, class_ids: np.ndarray, confidences: np.ndarray) -> np.ndarray:
+        assigned = np.full(len(bboxes), DetectionBatch.NO_TRACK, dtype=np.int64)
+        predicted = self.boxes + self.velocities * (self.misses[:, None] + 1)
+
+        high = np.flatnonzero(confidences >= self.high_threshold)
+        low = np.flatnonzero((confidences >= self.low_threshold) & (confidences < self.high_threshold))
+
+        # Stage 1: high-confidence detections against all tracks
+        det_a, trk_a = self._match(high, np.arange(len(self)), bboxes, class_ids, predicted)
+
+        # Stage 2: low-confidence detections recover the remaining tracks
+        remaining = np.setdiff1d(np.arange(len(self)), trk_a, assume_unique=True)
+        det_b, trk_b = self._match(low, remaining, bboxes, class_ids, predicted)
+
+        det_matched = np.concatenate([det_a, det_b])
+        trk_matched = np.concatenate([trk_a, trk_b])
+
+        # Matched tracks: smooth velocity, snap box to observation
+        if len(trk_matched):
+            steps = (self.misses[trk_matched] + 1)[:, None]
+            observed = (bboxes[det_matched] - self.boxes[trk_matched]) / steps
+            alpha = self.velocity_smoothing
+            self.velocities[trk_matched] = alpha * observed + (1 - alpha) * self.velocities[trk_matched]
+            self.boxes[trk_matched] = bboxes[det_matched]
+            assigned[det_matched] = self.track_ids[trk_matched]
+
+        self.misses += 1
+        self.misses[trk_matched] = 0
+
+        # Retire tracks unseen for more than max_age frames
+        alive = self.misses <= self.max_age
+        if not alive.all():
+            self.boxes = self.boxes[alive]
+            self.velocities = self.velocities[alive]
+            self.track_ids = self.track_ids[alive]
+            self.class_ids = self.class_ids[alive]
+            self.misses = self.misses[alive]
+
+        # Unmatched high-confidence detections start new tracks
+        new = np.setdiff1d(high, det_a, assume_unique=True)
+        if len(new):
+            new_ids = np.arange(self._next_id, self._next_id + len(new), dtype=np.int64)
+            self._next_id += len(new)
+            self.boxes = np.concatenate([self.boxes, bboxes[new]])
+            self.velocities = np.concatenate([self.velocities, np.zeros((len(new), 4))])
+            self.track_ids = np.concatenate([self.track_ids, new_ids])
+            self.class_ids = np.concatenate([self.class_ids, class_ids[new].astype(np.int32)])
+            self.misses = np.concatenate([self.misses, np.zeros(len(new), dtype=np.int32)])
+            assigned[new] = new_ids
+
+        return assigned
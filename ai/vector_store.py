@@ -0,0 +1,166 @@
+import logging
+import numpy as np
+from pathlib import Path
+from typing import Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+class GrowableArray:
+    """
+    Preallocated row store with capacity doubling.
+    Appends are amortized O(1); ``view`` exposes the filled rows as a
+    contiguous array without copying.
+    """
+    def __init__(self, row_shape: Tuple[int, ...] = (), dtype=np.float32, capacity: int = 1024):
+        self.row_shape = tuple(row_shape)
+        self.dtype = np.dtype(dtype)
+        self._buffer = np.empty((max(1, capacity),) + self.row_shape, dtype=self.dtype)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def capacity(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def view(self) -> np.ndarray:
+        """Filled rows; valid until the next append that triggers growth."""
+        return self._buffer[:self._size]
+
+    @property
+    def nbytes(self) -> int:
+        return self._size * self._buffer[0].nbytes
+
+    def reserve(self, capacity: int):
+        """Ensure room for at least capacity rows."""
+        if capacity <= self.capacity:
+            return
+        new_capacity = self.capacity
+        while new_capacity < capacity:
+            new_capacity *= 2
+        self._resize(new_capacity)
+
+    def _resize(self, capacity: int):
+        buffer = np.empty((capacity,) + self.row_shape, dtype=self.dtype)
+        buffer[:self._size] = self._buffer[:self._size]
+        self._buffer = buffer
+
+    def flush(self):
+        """Persist pending writes (no-op for in-memory stores)."""
+
+    def append(self, row) -> int:
+        """Append one row; returns its position."""
+        self.reserve(self._size + 1)
+        self._buffer[self._size] = row
+        self._size += 1
+        return self._size - 1
+
+    def extend(self, rows: np.ndarray) -> int:
+        """Append several rows; returns the position of the first."""
+        rows = np.asarray(rows, dtype=self.dtype).reshape((-1,) + self.row_shape)
+        start = self._size
+        self.reserve(start + len(rows))
+        self._buffer[start:start + len(rows)] = rows
+        self._size += len(rows)
+        return start
+
+class MappedArray(GrowableArray):
+    """
+    File-backed GrowableArray.
+    Rows live in a raw memory-mapped file that grows by capacity doubling,
+    so reopening is instant and the OS page cache decides what is resident.
+    The file carries no header: the number of valid rows is owned by the
+    caller's manifest, which makes a torn tail after a crash harmless.
+    """
+    def __init__(self, path: Path, row_shape: Tuple[int, ...] = (), dtype=np.float32, size: int = 0, capacity: int = 1024):
+        self.path = Path(path)
+        self.row_shape = tuple(row_shape)
+        self.dtype = np.dtype(dtype)
+        self._row_bytes = max(1, int(np.prod(self.row_shape, dtype=np.int64)) * self.dtype.itemsize)
+
+        existing = self.path.stat().st_size // self._row_bytes if self.path.exists() else 0
+        if size > existing:
+            raise ValueError(f"{self.path} holds {existing} rows, manifest expects {size}")
+
+        self._buffer = None
+        self._size = size
+        self._map(max(existing, capacity, 1))
+
+    def _map(self, capacity: int):
+        with open(self.path, "ab") as f:
+            if f.tell() < capacity * self._row_bytes:
+                f.truncate(capacity * self._row_bytes)
+        self._buffer = np.memmap(self.path, dtype=self.dtype, mode="r+", shape=(capacity,) + self.row_shape)
+
+    def _resize(self, capacity: int):
+        # Outstanding views keep the previous mapping alive
+        self._buffer.flush()
+        self._map(capacity)
+
+    def flush(self):
+        """Write dirty pages back to the file."""
+        self._buffer.flush()
+
+def select_top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest scores, best first, via partial selection."""
+    if k <= 0 or len(scores) == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < len(scores):
+        candidates = np.argpartition(-scores, k - 1)[:k]
+    else:
+        candidates = np.arange(len(scores))
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+def merge_top_k(
+    rows_a: np.ndarray, scores_a: np.ndarray, rows_b: np.ndarray, scores_b: np.ndarray, k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Combine two (rows, scores) candidate sets into one top-k, best first."""
+    rows = np.concatenate([rows_a, rows_b])
+    scores = np.concatenate([scores_a, scores_b])
+    keep = select_top_k(scores, k)
+    return rows[keep], scores[keep]
+
+def _score(block: np.ndarray, query: Any, codec) -> np.ndarray:
+    return np.dot(block, query) if codec is None else codec.score(block, query)
+
+def top_k_search(
+    matrix: np.ndarray, query: Any, k: int, chunk_size: int = 65536, codec=None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact inner-product top-k over the rows of matrix.
+    Rows are scored chunk by chunk so peak memory is bounded by chunk_size,
+    not by the index size. With a codec, matrix holds its codes and query is
+    the output of codec.prepare(). Returns (rows, scores), best first.
+    """
+    best_rows = np.empty(0, dtype=np.intp)
+    best_scores = np.empty(0, dtype=np.float32)
+
+    for start in range(0, len(matrix), chunk_size):
+        scores = _score(matrix[start:start + chunk_size], query, codec)
+        top = select_top_k(scores, k)
+
+        # Merge the chunk winners into the running top-k
+        best_rows, best_scores = merge_top_k(best_rows, best_scores, top + start, scores[top], k)
+
+    return best_rows, best_scores
+
+def top_k_search_rows(
+    matrix: np.ndarray, rows: np.ndarray, query: Any, k: int, chunk_size: int = 65536, codec=None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Exact inner-product top-k restricted to the given (ascending) row positions.
+    Rows are gathered chunk by chunk, so the cost follows len(rows), not the
+    matrix size. Returns (rows, scores), best first.
+    """
+    best_rows = np.empty(0, dtype=np.intp)
+    best_scores = np.empty(0, dtype=np.float32)
+
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        scores = _score(matrix[chunk], query, codec)
+        top = select_top_k(scores, k)
+        best_rows, best_scores = merge_top_k(best_rows, best_scores, chunk[top], scores[top], k)
+
+    return best_rows, best_scores
@@ -1,10 +1,12 @@
 import numpy as np
 import cv2
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple, Union
 from datetime import datetime
-from dataclasses import dataclass
-from ai.base import Detection
+from dataclasses import dataclass, field
+from ai.base import Detection, DetectionBatch
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +15,10 @@ class ZoneConfig:
     """
     Configuration for a Strategic Observation Zone.
     Supports complex polygon boundaries and class-specific sensitivity.
+
+    Assigning a field bumps ``version`` so a ZoneEngine recompiles the zone;
+    edits inside the coordinate or class lists are not seen, so change those
+    by assignment or through ZoneEngine.update_zone().
     """
     id: int
     name: str
@@ -22,11 +28,17 @@ class ZoneConfig:
     loiter_threshold: int = 30 # seconds
     color: str = "#1F4FD8" # Strategic Blue
     is_active: bool = True
+    version: int = field(default=0, init=False, repr=False, compare=False)
 
     def __post_init__(self):
         if self.detection_classes is None:
             self.detection_classes = ["person"]
 
+    def __setattr__(self, name: str, value: Any):
+        object.__setattr__(self, name, value)
+        if name != "version":
+            object.__setattr__(self, "version", getattr(self, "version", 0) + 1)
+
 @dataclass
 class ZoneViolation:
     """
@@ -39,104 +51,394 @@ class ZoneViolation:
     timestamp: datetime
     dwell_time: Optional[float] = None
 
+class _TrackState:
+    __slots__ = ("entries", "last_seen")
+
+    def __init__(self, now: float):
+        self.entries: Dict[int, float] = {}  # zone_id -> monotonic entry time
+        self.last_seen = now
+
+class TrackRegistry:
+    """
+    Bounded store of per-track zone entry times.
+    Tracks unseen for ttl seconds expire; beyond capacity the least recently
+    seen track is evicted. All times are monotonic-clock seconds.
+    """
+    def __init__(self, capacity: int = 10000, ttl: float = 120.0):
+        self.capacity = capacity
+        self.ttl = ttl
+        self._tracks: "OrderedDict[str, _TrackState]" = OrderedDict()
+
+        # Eviction Metrics
+        self.evicted_ttl = 0
+        self.evicted_capacity = 0
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._tracks
+
+    def get(self, key: str) -> Optional[Dict[int, float]]:
+        """Zone entry times of a track, if it is still live."""
+        state = self._tracks.get(key)
+        return state.entries if state else None
+
+    def touch(self, key: str, now: float) -> Dict[int, float]:
+        """Mark a track as seen and return its (mutable) zone entry times."""
+        state = self._tracks.get(key)
+        if state is None:
+            state = self._tracks[key] = _TrackState(now)
+            if len(self._tracks) > self.capacity:
+                self._tracks.popitem(last=False)
+                self.evicted_capacity += 1
+        else:
+            state.last_seen = now
+            self._tracks.move_to_end(key)
+        return state.entries
+
+    def expire(self, now: float):
+        """Drop tracks not seen within the TTL. Oldest-seen tracks sit at the front."""
+        cutoff = now - self.ttl
+        while self._tracks:
+            key, state = next(iter(self._tracks.items()))
+            if state.last_seen >= cutoff:
+                break
+            del self._tracks[key]
+            self.evicted_ttl += 1
+
+    def get_stats(self) -> Dict[str, int]:
+        return {
+            "live": len(self._tracks),
+            "evicted_ttl": self.evicted_ttl,
+            "evicted_capacity": self.evicted_capacity,
+        }
+
+class _CompiledZones:
+    """
+    Array form of the registered zones for vectorized containment tests.
+    Edges of every polygon are packed into flat arrays; each zone owns a
+    contiguous run [edge_start, edge_end) of them.
+    """
+    def __init__(self, zones: List[ZoneConfig]):
+        self.zone_ids = [zone.id for zone in zones]
+        self.bbox_min = np.zeros((len(zones), 2))
+        self.bbox_max = np.zeros((len(zones), 2))
+        self.edge_start = np.zeros(len(zones), dtype=np.intp)
+        self.edge_end = np.zeros(len(zones), dtype=np.intp)
+
+        xi, yi, xj, yj = [], [], [], []
+        for z, zone in enumerate(zones):
+            poly = np.asarray(zone.coordinates, dtype=np.float64).reshape(-1, 2)
+            self.bbox_min[z] = poly.min(axis=0)
+            self.bbox_max[z] = poly.max(axis=0)
+
+            prev = np.roll(poly, 1, axis=0)
+            # Horizontal edges can never straddle the ray
+            keep = poly[:, 1] != prev[:, 1]
+            self.edge_start[z] = len(xi)
+            xi.extend(poly[keep, 0]); yi.extend(poly[keep, 1])
+            xj.extend(prev[keep, 0]); yj.extend(prev[keep, 1])
+            self.edge_end[z] = len(xi)
+
+        self.xi = np.asarray(xi, dtype=np.float64)
+        self.yi = np.asarray(yi, dtype=np.float64)
+        self.xj = np.asarray(xj, dtype=np.float64)
+        self.yj = np.asarray(yj, dtype=np.float64)
+        self.slope = (self.xj - self.xi) / (self.yj - self.yi)
+
+    def contains(self, points: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """
+        Ray-cast every point against every zone in one pass.
+        Only rows with at least one candidate zone are evaluated; returns an N x Z mask.
+        """
+        inside = np.zeros(candidates.shape, dtype=bool)
+        rows = np.flatnonzero(candidates.any(axis=1))
+        if len(rows) == 0 or len(self.xi) == 0:
+            return inside
+
+        x = points[rows, 0:1]
+        y = points[rows, 1:2]
+        crossings = ((self.yi > y) != (self.yj > y)) & (x < self.slope * (y - self.yi) + self.xi)
+
+        # Per-zone crossing counts via prefix sums over each zone's edge run
+        prefix = np.zeros((len(rows), len(self.xi) + 1), dtype=np.int32)
+        np.cumsum(crossings, axis=1, out=prefix[:, 1:])
+        counts = prefix[:, self.edge_end] - prefix[:, self.edge_start]
+
+        inside[rows] = (counts & 1).astype(bool) & candidates[rows]
+        return inside
+
+class _ZoneRaster:
+    """
+    Precomputed zone membership grid for fixed camera views.
+    Each cell stores a little-endian bitmask of the zones covering it, so
+    classifying a point is a single array lookup regardless of zone count
+    or polygon complexity. Accuracy is bounded by the grid resolution.
+    """
+    def __init__(self, zones: List[ZoneConfig], resolution: Tuple[int, int]):
+        self.width, self.height = resolution
+        self.num_zones = len(zones)
+        self.grid = np.zeros((self.height, self.width, max(1, (len(zones) + 7) // 8)), dtype=np.uint8)
+
+        layer = np.zeros((self.height, self.width), dtype=np.uint8)
+        scale = np.array([self.width, self.height], dtype=np.float64)
+        for z, zone in enumerate(zones):
+            # Sub-pixel vertices (8 fractional bits) in pixel-center convention
+            poly = np.asarray(zone.coordinates, dtype=np.float64).reshape(-1, 2)
+            pts = np.round((poly * scale - 0.5) * 256).astype(np.int32)
+
+            layer[:] = 0
+            cv2.fillPoly(layer, [pts], 1, lineType=cv2.LINE_8, shift=8)
+            self.grid[:, :, z // 8] |= layer << (z % 8)
+
+    def contains(self, points: np.ndarray, candidates: np.ndarray) -> np.ndarray:
+        """Look up every point's zone bitmask; returns an N x Z mask."""
+        cols = np.floor(points[:, 0] * self.width).astype(np.intp)
+        rows = np.floor(points[:, 1] * self.height).astype(np.intp)
+        in_frame = (cols >= 0) & (cols < self.width) & (rows >= 0) & (rows < self.height)
+
+        cells = self.grid[np.clip(rows, 0, self.height - 1), np.clip(cols, 0, self.width - 1)]
+        inside = np.unpackbits(cells, axis=1, count=self.num_zones, bitorder="little").astype(bool)
+        return inside & candidates & in_frame[:, None]
+
+class _OverlayCache:
+    """
+    Precomputed zone overlay for one frame resolution and zone set.
+    Fill and outline/label layers are cropped to the zones' bounding region,
+    so a frame costs one blend over that region; only violated zones are
+    recolored, within their own extents.
+    """
+    CLEAR = (216, 79, 31)  # Alpha-Blue
+    VIOLATED = (0, 0, 255)  # Red
+
+    def __init__(self, zones: List[ZoneConfig], h: int, w: int, revision: int):
+        self.key = (h, w, revision)
+        self.zone_index = {zone.id: z + 1 for z, zone in enumerate(zones)}
+
+        # Label 0 is background; zone z is drawn as z + 1
+        fill = np.zeros((h, w), dtype=np.uint16)
+        outline = np.zeros((h, w), dtype=np.uint16)
+        text = np.zeros((h, w), dtype=np.uint8)  # putText only draws on 8-bit images
+        for z, zone in enumerate(zones):
+            # Convert normalized to pixel coords
+            pts = np.array([[int(x*w), int(y*h)] for x, y in zone.coordinates], np.int32)
+            cv2.fillPoly(fill, [pts], z + 1)
+            cv2.polylines(outline, [pts], True, z + 1, 2)
+
+            text[:] = 0
+            cv2.putText(text, zone.name, (int(pts[0][0]), int(pts[0][1]) - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, 1, 1)
+            outline[text > 0] = z + 1
+
+        ys, xs = np.nonzero(fill | outline)
+        if len(ys) == 0:
+            self.roi = None
+            return
+
+        y0, x0 = ys.min(), xs.min()
+        self.roi = (slice(y0, ys.max() + 1), slice(x0, xs.max() + 1))
+        self.fill = fill[self.roi]
+        self.outline = outline[self.roi]
+        self.fill_mask = (self.fill > 0).astype(np.uint8)
+        self.outline_mask = (self.outline > 0).astype(np.uint8)
+
+        # Per-zone extents inside the ROI bound the recoloring work
+        self.zone_rects: Dict[int, Tuple[slice, slice]] = {}
+        for label in range(1, len(zones) + 1):
+            zy, zx = np.nonzero((self.fill == label) | (self.outline == label))
+            if len(zy):
+                self.zone_rects[label] = (slice(zy.min(), zy.max() + 1), slice(zx.min(), zx.max() + 1))
+
+        self.clear_fill = np.zeros(self.fill.shape + (3,), dtype=np.uint8)
+        self.clear_fill[self.fill_mask > 0] = self.CLEAR
+        self.clear_outline = np.zeros(self.outline.shape + (3,), dtype=np.uint8)
+        self.clear_outline[self.outline_mask > 0] = self.CLEAR
+
+    def _recolor(self, layer: np.ndarray, labels: np.ndarray, violated: List[int]) -> np.ndarray:
+        layer = layer.copy()
+        for label in violated:
+            rect = self.zone_rects.get(label)
+            if rect is not None:
+                layer[rect][labels[rect] == label] = self.VIOLATED
+        return layer
+
+    def render(self, frame: np.ndarray, violation_ids: set) -> np.ndarray:
+        if self.roi is None:
+            return frame
+
+        fill, outline = self.clear_fill, self.clear_outline
+        violated = [self.zone_index[zone_id] for zone_id in violation_ids if zone_id in self.zone_index]
+        if violated:
+            fill = self._recolor(fill, self.fill, violated)
+            outline = self._recolor(outline, self.outline, violated)
+
+        # Single blend over the zone region, written back through the masks
+        region = frame[self.roi]
+        blended = cv2.addWeighted(fill, 0.15, region, 0.85, 0)
+        cv2.copyTo(blended, self.fill_mask, region)
+        cv2.copyTo(outline, self.outline_mask, region)
+        return frame
+
 class ZoneEngine:
     """
     Industrial-grade polygon zone detection engine.
     Handles intrusion detection and dwell-time monitoring.
+
+    With raster_resolution=(width, height) the zones are rasterized into a
+    bitmask grid and each contact point is classified by one lookup. The
+    grid is rebuilt whenever zones are added, updated or removed.
     """
-    def __init__(self):
+    def __init__(
+        self,
+        raster_resolution: Optional[Tuple[int, int]] = None,
+        track_ttl: float = 120.0,
+        max_tracks: int = 10000,
+    ):
         self.zones: Dict[int, ZoneConfig] = {}
-        self.object_entries: Dict[str, Dict[int, datetime]] = {}
+        self.object_entries = TrackRegistry(capacity=max_tracks, ttl=track_ttl)
         self.last_state: Dict[int, set] = {}
+        self.raster_resolution = raster_resolution
+        self._compiled: Optional[Union[_CompiledZones, _ZoneRaster]] = None
+        self._revision = 0
+        self._zone_versions: Tuple[Tuple[int, int], ...] = ()
+        self._overlay: Optional[_OverlayCache] = None
 
     def add_zone(self, zone: ZoneConfig):
         """Register a new observation zone."""
         self.zones[zone.id] = zone
         self.last_state[zone.id] = set()
+        self._invalidate()
         logger.info(f"Strategic Zone Registered: {zone.name} [ID: {zone.id}]")
 
-    def _point_in_polygon(self, point: Tuple[float, float], polygon: List[List[float]]) -> bool:
-        """Ray-casting algorithm for technical boundary verification."""
-        x, y = point
-        n = len(polygon)
-        inside = False
-        j = n - 1
-        for i in range(n):
-            xi, yi = polygon[i]
-            xj, yj = polygon[j]
-            if ((yi > y) != (yj > y)) and (x < (xj - xi) * (y - yi) / (yj - yi) + xi):
-                inside = not inside
-            j = i
-        return inside
+    def update_zone(self, zone_id: int, **changes: Any):
+        """Modify a registered zone (geometry, classes, activation) in place."""
+        zone = self.zones[zone_id]
+        for key, value in changes.items():
+            setattr(zone, key, value)
+        self._invalidate()
+
+    def remove_zone(self, zone_id: int):
+        """Deregister an observation zone."""
+        self.zones.pop(zone_id, None)
+        self.last_state.pop(zone_id, None)
+        self._invalidate()
+
+    def _invalidate(self):
+        """Drop every structure derived from the zone set."""
+        self._compiled = None
+        self._revision += 1
+        self._zone_versions = tuple((zone.id, zone.version) for zone in self.zones.values())
+
+    def _sync(self):
+        """Recompile after fields of a registered ZoneConfig were reassigned directly."""
+        if tuple((zone.id, zone.version) for zone in self.zones.values()) != self._zone_versions:
+            self._invalidate()
+
+    def _compile(self) -> Union[_CompiledZones, _ZoneRaster]:
+        if self._compiled is None:
+            zones = list(self.zones.values())
+            if self.raster_resolution:
+                self._compiled = _ZoneRaster(zones, self.raster_resolution)
+            else:
+                self._compiled = _CompiledZones(zones)
+        return self._compiled
+
+    def _containment(self, detections: Union[List[Detection], DetectionBatch]) -> np.ndarray:
+        """N x Z mask of detections whose contact point lies in a zone that watches their class."""
+        compiled = self._compile()
+        zones = list(self.zones.values())
+
+        if isinstance(detections, DetectionBatch):
+            # Contact point: bottom-center of bbox
+            points = detections.contact_points().astype(np.float64)
+            class_names = detections.class_names
+        else:
+            bboxes = np.array([d.bbox for d in detections], dtype=np.float64).reshape(-1, 4)
+            points = np.column_stack(((bboxes[:, 0] + bboxes[:, 2]) / 2, bboxes[:, 3]))
+            class_names = [d.class_name for d in detections]
 
-    def process(self, detections: List[Detection]) -> List[ZoneViolation]:
+        # Class eligibility, resolved once per distinct class in the frame
+        unique_names, inverse = np.unique(np.asarray(class_names, dtype=object), return_inverse=True)
+        eligible = np.array(
+            [[zone.is_active and name in zone.detection_classes for zone in zones] for name in unique_names],
+            dtype=bool,
+        ).reshape(len(unique_names), len(zones))[inverse.reshape(-1)]
+
+        if isinstance(compiled, _ZoneRaster):
+            return compiled.contains(points, eligible)
+
+        # Bounding-box rejection before any edge arithmetic
+        in_bbox = np.all(
+            (points[:, None, :] >= compiled.bbox_min) & (points[:, None, :] <= compiled.bbox_max),
+            axis=2,
+        )
+        return compiled.contains(points, eligible & in_bbox)
+
+    def process(self, detections: Union[List[Detection], DetectionBatch]) -> List[ZoneViolation]:
         """Verify situational awareness data against all active zones."""
         violations = []
         current_time = datetime.now()
+        now = time.monotonic()
+        if not self.zones:
+            return violations
+        self._sync()
 
-        for zone in self.zones.values():
+        inside = self._containment(detections) if len(detections) else None
+        materialized: Dict[int, Detection] = {}
+
+        for z, zone in enumerate(self.zones.values()):
             if not zone.is_active: continue
             
             current_inside = set()
-            for detection in detections:
-                if detection.class_name not in zone.detection_classes: continue
-                
-                # Check bottom-center of bbox (contact point)
-                x1, y1, x2, y2 = detection.bbox
-                point = ((x1 + x2) / 2, y2)
+            hits = np.flatnonzero(inside[:, z]).tolist() if inside is not None else []
+            for i in hits:
+                # DetectionBatch rows are materialized once, on first hit
+                detection = materialized.get(i)
+                if detection is None:
+                    detection = materialized[i] = detections[i]
+
+                track_id = str(detection.track_id or id(detection))
+                current_inside.add(track_id)
+                entries = self.object_entries.touch(track_id, now)
                 
-                if self._point_in_polygon(point, zone.coordinates):
-                    track_id = str(detection.track_id or id(detection))
-                    current_inside.add(track_id)
+                # Entry Logic
+                if track_id not in self.last_state.get(zone.id, set()):
+                    entries[zone.id] = now
                     
-                    # Entry Logic
-                    if track_id not in self.last_state.get(zone.id, set()):
-                        if track_id not in self.object_entries:
-                            self.object_entries[track_id] = {}
-                        self.object_entries[track_id][zone.id] = current_time
-                        
+                    violations.append(ZoneViolation(
+                        zone_id=zone.id, zone_name=zone.name,
+                        event_type="entered", detection=detection,
+                        timestamp=current_time
+                    ))
+                
+                # Loitering Logic
+                elif zone.zone_type == "loitering":
+                    # A track evicted from the registry while inside restarts its dwell clock
+                    entry_time = entries.setdefault(zone.id, now)
+                    dwell = now - entry_time
+                    if dwell >= zone.loiter_threshold:
                         violations.append(ZoneViolation(
                             zone_id=zone.id, zone_name=zone.name,
-                            event_type="entered", detection=detection,
-                            timestamp=current_time
+                            event_type="loitering", detection=detection,
+                            timestamp=current_time, dwell_time=dwell
                         ))
-                    
-                    # Loitering Logic
-                    elif zone.zone_type == "loitering":
-                        entry_time = self.object_entries.get(track_id, {}).get(zone.id)
-                        if entry_time:
-                            dwell = (current_time - entry_time).total_seconds()
-                            if dwell >= zone.loiter_threshold:
-                                violations.append(ZoneViolation(
-                                    zone_id=zone.id, zone_name=zone.name,
-                                    event_type="loitering", detection=detection,
-                                    timestamp=current_time, dwell_time=dwell
-                                ))
 
             self.last_state[zone.id] = current_inside
+
+        self.object_entries.expire(now)
         return violations
 
+    def get_track_stats(self) -> Dict[str, int]:
+        """Live and evicted track-state counters."""
+        return self.object_entries.get_stats()
+
     def overlay(self, frame: np.ndarray, violations: List[ZoneViolation]) -> np.ndarray:
         """Render the tactical zone overlay on a video frame."""
         h, w = frame.shape[:2]
-        violation_ids = {v.zone_id for v in violations}
-        
-        for zone in self.zones.values():
-            # Convert normalized to pixel coords
-            pts = np.array([[int(x*w), int(y*h)] for x, y in zone.coordinates], np.int32)
-            
-            # Color logic: Red if violated, Alpha-Blue if clear
-            color = (0, 0, 255) if zone.id in violation_ids else (216, 79, 31)
-            
-            # Fill
-            mask = frame.copy()
-            cv2.fillPoly(mask, [pts], color)
-            cv2.addWeighted(mask, 0.15, frame, 0.85, 0, frame)
-            
-            # Outline
-            cv2.polylines(frame, [pts], True, color, 2)
-            
-            # Label
-            cv2.putText(frame, zone.name, (pts[0][0], pts[0][1] - 10),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
-        return frame
+        self._sync()
+        cache = self._overlay
+        if cache is None or cache.key != (h, w, self._revision):
+            cache = self._overlay = _OverlayCache(list(self.zones.values()), h, w, self._revision)
+
+        return cache.render(frame, {v.zone_id for v in violations})
@@ -2,11 +2,69 @@ import cv2
 import numpy as np
 import logging
 import asyncio
-from typing import Optional, Tuple, Callable
+import threading
+import time
+from typing import Optional, Tuple, Callable, Dict, Any
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+class FrameSlot:
+    """
+    Single-frame mailbox between a capture thread and an asyncio consumer.
+    A newer frame always replaces an unconsumed one (latest-frame-wins).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frame: Optional[np.ndarray] = None
+        self._frame_id = 0
+        self._captured_at = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ready: Optional[asyncio.Event] = None
+        self._closed = False
+        self.dropped = 0
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        """Attach the slot to the event loop that will consume it."""
+        self._loop = loop
+        self._ready = asyncio.Event()
+
+    def put(self, frame: np.ndarray, frame_id: int):
+        """Publish a frame from the capture thread. Never blocks on the consumer."""
+        with self._lock:
+            if self._frame is not None:
+                self.dropped += 1
+            self._frame = frame
+            self._frame_id = frame_id
+            self._captured_at = time.monotonic()
+
+        self._notify()
+
+    def close(self):
+        """Wake the consumer permanently; subsequent gets return None."""
+        self._closed = True
+        self._notify()
+
+    def _notify(self):
+        try:
+            self._loop.call_soon_threadsafe(self._ready.set)
+        except RuntimeError:
+            # Event loop already closed; the consumer is gone.
+            pass
+
+    async def get(self) -> Optional[Tuple[np.ndarray, int, float]]:
+        """Wait for the newest frame. Returns (frame, frame_id, captured_at), or None once closed."""
+        while True:
+            await self._ready.wait()
+            with self._lock:
+                self._ready.clear()
+                if self._frame is None:
+                    if self._closed:
+                        return None
+                    continue
+                frame, self._frame = self._frame, None
+                return frame, self._frame_id, self._captured_at
+
 class StreamProcessor:
     """
     High-performance video acquisition and processing engine.
@@ -18,37 +76,85 @@ class StreamProcessor:
         camera_id: int,
         fps: int = 30,
         resolution: Tuple[int, int] = (1920, 1080),
+        threaded_capture: bool = False,
+        max_frame_age: Optional[float] = None,
     ):
         self.source = source
         self.camera_id = camera_id
         self.fps = fps
         self.resolution = resolution
-        
+        # Threaded capture decodes on a dedicated thread; frames older than
+        # max_frame_age (seconds) at hand-off are discarded as stale.
+        self.threaded_capture = threaded_capture
+        self.max_frame_age = max_frame_age
+
         self.capture: Optional[cv2.VideoCapture] = None
         self.is_running = False
+        # Files decode as fast as the CPU allows and are paced to fps;
+        # live sources (RTSP, webcams) block in read() at their own rate.
+        self.is_file_source = False
+        # Sticky: a stop() issued before the cycle starts must not be re-armed
+        self._stop_requested = False
         self.frame_count = 0
         self.last_frame_time = None
 
+        # Capture Metrics
+        self.captured_count = 0
+        self.stale_frames = 0
+        self._slot: Optional[FrameSlot] = None
+        self._capture_thread: Optional[threading.Thread] = None
+
+    @property
+    def dropped_frames(self) -> int:
+        """Frames overwritten in the slot before the consumer picked them up."""
+        return self._slot.dropped if self._slot else 0
+
     def connect(self) -> bool:
         """Initiate connection to the mission-critical data source."""
         try:
             logger.info(f"Acquiring stream for Unit {self.camera_id}: {self.source}")
             self.capture = cv2.VideoCapture(self.source)
-            
+
             if not self.capture.isOpened():
                 logger.error("Source acquisition failed. Verify stream protocol.")
                 return False
 
+            self.is_file_source = self.capture.get(cv2.CAP_PROP_FRAME_COUNT) > 0
             return True
         except Exception as e:
             logger.error(f"Acquisition error: {e}")
             return False
 
+    def get_metrics(self) -> Dict[str, Any]:
+        """Snapshot of acquisition counters."""
+        return {
+            "camera_id": self.camera_id,
+            "captured": self.captured_count,
+            "processed": self.frame_count,
+            "dropped": self.dropped_frames,
+            "stale": self.stale_frames,
+        }
+
+    def stop(self):
+        """Signal the acquisition cycle to terminate."""
+        self._stop_requested = True
+        self.is_running = False
+        if self._slot:
+            self._slot.close()
+
     async def start_processing(self, callback: Callable[[np.ndarray, int], None]):
         """Continuous situational awareness cycle."""
         if not self.capture or not self.capture.isOpened():
             return
 
+        if self._stop_requested:
+            self.capture.release()
+            return
+
+        if self.threaded_capture:
+            await self._process_threaded(callback)
+            return
+
         self.is_running = True
         frame_delay = 1.0 / self.fps
 
@@ -62,12 +168,78 @@ class StreamProcessor:
 
                 self.frame_count += 1
                 self.last_frame_time = datetime.utcnow()
-                
+
                 # Execute situational awareness callback
                 await callback(frame, self.frame_count)
-                
+
                 await asyncio.sleep(frame_delay)
         finally:
             self.is_running = False
             if self.capture:
                 self.capture.release()
+
+    def _capture_loop(self):
+        """Decode frames on a dedicated thread and publish them to the slot."""
+        frame_delay = 1.0 / self.fps
+
+        try:
+            self._read_loop(frame_delay)
+        finally:
+            self._slot.close()
+
+    def _read_loop(self, frame_delay: float):
+        while self.is_running:
+            started = time.monotonic()
+            ret, frame = self.capture.read()
+            if not ret or frame is None:
+                logger.warning("Frame drop detected. Re-evaluating stream health.")
+                time.sleep(1)
+                continue
+
+            self.captured_count += 1
+            self._slot.put(frame, self.captured_count)
+
+            # Live sources must be drained continuously or their decoder
+            # falls behind; the slot already keeps only the newest frame.
+            if not self.is_file_source:
+                continue
+            remaining = frame_delay - (time.monotonic() - started)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    async def _process_threaded(self, callback: Callable[[np.ndarray, int], None]):
+        """Consume the newest decoded frame without blocking the event loop."""
+        self._slot = FrameSlot()
+        self._slot.bind(asyncio.get_running_loop())
+        self.is_running = True
+
+        self._capture_thread = threading.Thread(
+            target=self._capture_loop,
+            name=f"sentinel-capture-{self.camera_id}",
+            daemon=True,
+        )
+        self._capture_thread.start()
+
+        try:
+            while self.is_running:
+                item = await self._slot.get()
+                if item is None:
+                    break
+
+                frame, _, captured_at = item
+
+                if self.max_frame_age is not None and time.monotonic() - captured_at > self.max_frame_age:
+                    self.stale_frames += 1
+                    continue
+
+                self.frame_count += 1
+                self.last_frame_time = datetime.utcnow()
+
+                # Execute situational awareness callback
+                await callback(frame, self.frame_count)
+        finally:
+            self.is_running = False
+            # Release only after the decoder thread has left read()
+            await asyncio.get_running_loop().run_in_executor(None, self._capture_thread.join)
+            if self.capture:
+                self.capture.release()
@@ -1,31 +1,255 @@
+import asyncio
 import logging
-from typing import Dict, Optional
+import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple, Union
 from core.stream import TechnicalStream
-from ai.base import BaseDetector
+from ai.base import BaseDetector, Detection
+from ai.batching import MicroBatcher
+from ai.tracker import ObjectTracker
+from camera.processor import StreamProcessor
 
 logger = logging.getLogger(__name__)
 
+# Receives (camera_id, frame, frame_id, detections) for every processed frame.
+DetectionHandler = Callable[[int, np.ndarray, int, List[Detection]], Awaitable[None]]
+
 class StreamManager:
     """
     Orchestrator for concurrent surveillance streams.
     Manages camera lifecycles and AI detector assignment.
+
+    Every stream decodes on its own capture thread and feeds a bounded
+    per-camera queue. A fixed pool of inference workers serves the cameras
+    round-robin, so a busy camera cannot starve the others. Each camera has
+    at most one frame in flight, which keeps per-camera results ordered and
+    lets ``track_objects`` run one ObjectTracker per camera. A detector
+    shared by several workers must tolerate concurrent calls; use
+    ``num_workers=1`` for models that do not.
+
+    With ``max_batch_size > 1`` the workers submit to a cross-camera
+    MicroBatcher instead, which runs one ``detect_batch`` pass at a time on
+    its own thread. ``num_workers`` then bounds the frames in flight, so it
+    is raised to at least ``max_batch_size``.
     """
-    def __init__(self):
+    def __init__(
+        self,
+        num_workers: int = 2,
+        queue_size: int = 2,
+        max_frame_age: Optional[float] = 1.0,
+        max_batch_size: int = 1,
+        max_batch_latency: float = 0.01,
+        track_objects: bool = False,
+    ):
         self.active_streams: Dict[int, TechnicalStream] = {}
         self.detector: Optional[BaseDetector] = None
+        if max_batch_size > 1 and num_workers < max_batch_size:
+            logger.warning(f"num_workers={num_workers} would cap batches below max_batch_size; using {max_batch_size}")
+            num_workers = max_batch_size
+        self.num_workers = num_workers
+        self.queue_size = queue_size
+        self.max_frame_age = max_frame_age
+        self.max_batch_size = max_batch_size
+        self.max_batch_latency = max_batch_latency
+        self.track_objects = track_objects
+
+        self._processors: Dict[int, StreamProcessor] = {}
+        self._queues: Dict[int, Deque[Tuple[np.ndarray, int]]] = {}
+        self._capture_tasks: Dict[int, asyncio.Task] = {}
+        # Camera ids reserved by a start_stream that is still connecting
+        self._starting: Set[int] = set()
+        self._handlers: List[DetectionHandler] = []
+        self._trackers: Dict[int, ObjectTracker] = {}
+
+        # Round-robin schedule: a camera id stays in _scheduled while it is queued or in flight
+        self._ready: Optional[asyncio.Queue] = None
+        self._scheduled: Set[int] = set()
+        self._workers: List[asyncio.Task] = []
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._batcher: Optional[MicroBatcher] = None
 
     def set_detector(self, detector: BaseDetector):
         """Assign an active AI intelligence layer."""
         self.detector = detector
         logger.info(f"Situational intelligence layer assigned: {type(detector).__name__}")
 
-    async def start_stream(self, camera_id: int, source: str):
+    def add_handler(self, handler: DetectionHandler):
+        """Register a coroutine invoked with the detections of every processed frame."""
+        self._handlers.append(handler)
+
+    def _ensure_workers(self):
+        if self._workers:
+            return
+
+        self._ready = asyncio.Queue()
+        if self.max_batch_size > 1:
+            self._batcher = MicroBatcher(
+                self._detect_batch,
+                max_batch_size=self.max_batch_size,
+                max_latency=self.max_batch_latency,
+                name="inference",
+            )
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.num_workers,
+                thread_name_prefix="sentinel-inference",
+            )
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.num_workers)]
+        logger.info(f"Inference worker pool online: {self.num_workers} workers")
+
+    async def start_stream(
+        self,
+        camera_id: int,
+        source: Union[str, int],
+        fps: int = 30,
+        name: Optional[str] = None,
+    ) -> bool:
         """Register and initiate a technical stream."""
+        if camera_id in self.active_streams or camera_id in self._starting:
+            logger.warning(f"Stream session already active: {camera_id}")
+            return False
+
         logger.info(f"Initiating stream acquisition: {camera_id} from {source}")
-        # Implementation details for stream acquisition to follow in v0.2.0
+        self._ensure_workers()
+        self._starting.add(camera_id)
+        try:
+            return await self._start_stream(camera_id, source, fps, name)
+        finally:
+            self._starting.discard(camera_id)
+
+    async def _start_stream(self, camera_id: int, source: Union[str, int], fps: int, name: Optional[str]) -> bool:
+        """Connect and register a stream whose id start_stream has reserved."""
+        processor = StreamProcessor(
+            source=source,
+            camera_id=camera_id,
+            fps=fps,
+            threaded_capture=True,
+            max_frame_age=self.max_frame_age,
+        )
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(None, processor.connect):
+            return False
+
+        self.active_streams[camera_id] = TechnicalStream(
+            source=str(source),
+            camera_id=camera_id,
+            name=name,
+            is_active=True,
+        )
+        self._processors[camera_id] = processor
+        self._queues[camera_id] = deque(maxlen=self.queue_size)
+        if self.track_objects:
+            self._trackers[camera_id] = ObjectTracker()
+        self._capture_tasks[camera_id] = asyncio.create_task(self._acquire(camera_id, processor))
+        return True
 
     async def stop_stream(self, camera_id: int):
         """Terminate and cleanup a stream."""
         if camera_id in self.active_streams:
             logger.info(f"Terminating stream session: {camera_id}")
-            self.active_streams.pop(camera_id)
+            self._processors[camera_id].stop()
+            await self._capture_tasks[camera_id]
+
+    async def join(self):
+        """Wait until every active stream has terminated."""
+        while self._capture_tasks:
+            await asyncio.gather(*list(self._capture_tasks.values()), return_exceptions=True)
+
+    async def shutdown(self):
+        """Terminate all streams and release the worker pool."""
+        for camera_id in list(self.active_streams):
+            await self.stop_stream(camera_id)
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+        if self._batcher:
+            await self._batcher.close()
+            self._batcher = None
+
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def _acquire(self, camera_id: int, processor: StreamProcessor):
+        """Run a processor's capture cycle, feeding its frames into the camera queue."""
+        async def enqueue(frame: np.ndarray, frame_id: int):
+            self._enqueue(camera_id, frame, frame_id)
+
+        try:
+            await processor.start_processing(enqueue)
+        except Exception as e:
+            logger.error(f"Stream failure on Unit {camera_id}: {e}")
+        finally:
+            stream = self.active_streams.pop(camera_id, None)
+            if stream:
+                stream.is_active = False
+                stream.queue_depth = 0
+            self._processors.pop(camera_id, None)
+            self._queues.pop(camera_id, None)
+            self._trackers.pop(camera_id, None)
+            self._capture_tasks.pop(camera_id, None)
+            self._scheduled.discard(camera_id)
+            logger.info(f"Stream session closed: {camera_id}")
+
+    def _detect_batch(self, frames: List[np.ndarray]) -> List[List[Detection]]:
+        if self.detector is None:
+            return [[] for _ in frames]
+        return self.detector.detect_batch(frames)
+
+    def _enqueue(self, camera_id: int, frame: np.ndarray, frame_id: int):
+        queue = self._queues.get(camera_id)
+        stream = self.active_streams.get(camera_id)
+        if queue is None or stream is None:
+            return
+
+        # Bounded queue: the oldest pending frame is discarded
+        if len(queue) == queue.maxlen:
+            stream.frames_dropped += 1
+        queue.append((frame, frame_id))
+        stream.queue_depth = len(queue)
+
+        if camera_id not in self._scheduled:
+            self._scheduled.add(camera_id)
+            self._ready.put_nowait(camera_id)
+
+    async def _worker(self):
+        """Serve one frame per turn from the next camera in the round-robin schedule."""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            camera_id = await self._ready.get()
+            queue = self._queues.get(camera_id)
+            stream = self.active_streams.get(camera_id)
+            if not queue or stream is None:
+                self._scheduled.discard(camera_id)
+                continue
+
+            frame, frame_id = queue.popleft()
+            stream.queue_depth = len(queue)
+
+            try:
+                detections = []
+                if self._batcher is not None:
+                    detections = await self._batcher.submit(frame)
+                elif self.detector is not None:
+                    detections = await loop.run_in_executor(self._executor, self.detector.detect, frame)
+
+                tracker = self._trackers.get(camera_id)
+                if tracker is not None:
+                    tracker.update(detections)
+                stream.record_processed()
+
+                for handler in self._handlers:
+                    await handler(camera_id, frame, frame_id, detections)
+            except Exception as e:
+                logger.error(f"Inference cycle failure on Unit {camera_id}: {e}")
+            finally:
+                # Re-join the back of the line if more frames are pending
+                if self._queues.get(camera_id):
+                    self._ready.put_nowait(camera_id)
+                else:
+                    self._scheduled.discard(camera_id)
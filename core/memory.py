@@ -1,111 +1,691 @@
 import sqlite3
 import json
 import logging
+import threading
+import time
+import weakref
+from collections import deque
+from dataclasses import dataclass
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from datetime import datetime, timedelta, timezone
+from typing import Deque, Iterator, List, Dict, Any, Optional, Sequence, Set, Tuple, Union
+from ai.base import Detection, DetectionBatch
 
 logger = logging.getLogger(__name__)
 
+# Keyset position of the last row returned: (ts_ms, id)
+PageCursor = Tuple[int, int]
+
+# Per-day partitions: column definitions and indexed column lists of each logical table
+PARTITION_SCHEMAS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "detections": (
+        # label_id references labels(id); ts_ms is UTC epoch milliseconds; track_id is NULL when untracked
+        "camera_id INTEGER, label_id INTEGER, confidence REAL, "
+        "x1 REAL, y1 REAL, x2 REAL, y2 REAL, track_id INTEGER, ts_ms INTEGER NOT NULL",
+        # Time-ordered access paths; rowid completes the (ts_ms, id) keyset order
+        ("camera_id, ts_ms", "label_id, ts_ms", "ts_ms"),
+    ),
+    "alerts": (
+        "camera_id INTEGER, title TEXT, message TEXT, severity TEXT, "
+        "timestamp DATETIME DEFAULT CURRENT_TIMESTAMP",
+        ("timestamp",),
+    ),
+}
+
+# Partition ids start at day ordinal * stride, so ids stay unique and time-ordered across days
+PARTITION_ID_STRIDE = 1 << 32
+
+# Detection rows as inserted: camera_id, label_id, confidence, x1, y1, x2, y2, track_id, ts_ms
+DetectionRow = Tuple[int, int, float, float, float, float, float, Optional[int], int]
+
+def _sql_time(value: datetime) -> str:
+    """Format like SQLite CURRENT_TIMESTAMP (UTC); naive datetimes are taken as local time."""
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+def _epoch_ms(value: datetime) -> int:
+    """UTC epoch milliseconds; naive datetimes are taken as local time."""
+    return int(value.timestamp() * 1000)
+
+def _partition_day(timestamp: str) -> str:
+    """Partition key (UTC day, YYYYMMDD) of an SQLite timestamp string."""
+    return timestamp[:10].replace("-", "")
+
+def _partition_day_ms(ts_ms: int) -> str:
+    """Partition key (UTC day, YYYYMMDD) of an epoch-millisecond timestamp."""
+    return datetime.fromtimestamp(ts_ms / 1000, timezone.utc).strftime("%Y%m%d")
+
+def _release_connection(conn: sqlite3.Connection, registry: Set[sqlite3.Connection], lock: threading.Lock):
+    with lock:
+        registry.discard(conn)
+    try:
+        conn.close()
+    except Exception as e:
+        logger.error(f"Vault Close Error: {e}")
+
+class _ThreadConnection:
+    """Thread-local owner of one connection; the connection closes when its thread's locals are released."""
+    def __init__(self, conn: sqlite3.Connection, registry: Set[sqlite3.Connection], lock: threading.Lock):
+        self.conn = conn
+        weakref.finalize(self, _release_connection, conn, registry, lock)
+
+@dataclass
+class DurabilityProfile:
+    """
+    SQLite tuning applied to every SovereignMemory connection.
+    With WAL, synchronous=NORMAL survives application crashes and may lose
+    only the last transactions on power loss; FULL syncs every commit; OFF
+    leaves flushing to the OS.
+    """
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    cache_size_kb: int = 65536
+    mmap_size: int = 256 * 1024 * 1024
+    busy_timeout_ms: int = 5000
+    wal_autocheckpoint: int = 1000  # Pages
+
+DURABILITY_PROFILES: Dict[str, DurabilityProfile] = {
+    "safe": DurabilityProfile(synchronous="FULL"),
+    "balanced": DurabilityProfile(),
+    "fast": DurabilityProfile(synchronous="OFF", wal_autocheckpoint=10000),
+}
+
 class SovereignMemory:
     """
     Sovereign Persistence Engine.
     Handles high-throughput storage of situational intelligence using a local SQLite substrate.
+
+    Each thread gets one long-lived connection, tuned by a DurabilityProfile
+    (a name from DURABILITY_PROFILES or an instance). A connection is closed
+    when its thread exits; close() releases all of them.
+
+    With async_writes=True, save_detections() only queues the frame's
+    detections; a writer thread formats and inserts them with executemany,
+    one transaction per flush_rows rows or flush_interval seconds. The queue
+    holds at most max_queue_rows. When it is full, overflow="drop" discards
+    the new rows and counts them; "block" makes the caller wait for space.
+    Queued rows become visible to queries after flush().
+
+    Detections and alerts are stored in one table per UTC day
+    (detections_YYYYMMDD, alerts_YYYYMMDD). Queries only touch the
+    partitions overlapping their window, and retention drops whole
+    partitions instead of deleting rows.
+
+    Detection rows are fixed-width: bbox as four REAL columns, the label as
+    an id into the labels dictionary table, epoch-millisecond timestamps and
+    the tracker id. Vaults written with the older bbox_json layout are
+    converted when opened.
     """
-    def __init__(self, db_path: str = "./sentinel_memory.db"):
+    def __init__(
+        self,
+        db_path: str = "./sentinel_memory.db",
+        profile: Union[str, DurabilityProfile] = "balanced",
+        async_writes: bool = False,
+        max_queue_rows: int = 100000,
+        flush_rows: int = 5000,
+        flush_interval: float = 0.5,
+        overflow: str = "drop",
+    ):
+        if overflow not in ("drop", "block"):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
         self.db_path = Path(db_path)
+        self.profile = DURABILITY_PROFILES[profile] if isinstance(profile, str) else profile
+        self.max_queue_rows = max_queue_rows
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self._local = threading.local()
+        self._connections: Set[sqlite3.Connection] = set()
+        self._lock = threading.Lock()
+        self._known_partitions: Set[str] = set()
+        self._label_ids: Dict[str, int] = {}
         self._initialize_vault()
 
+        # Background writer: queued (camera_id, detections, unix time) items
+        self._queue: Deque[Tuple[int, Union[Sequence[Detection], DetectionBatch], float]] = deque()
+        self._queued_rows = 0
+        self._in_flight = 0
+        self._cond = threading.Condition()
+        self._stats = {"queued_rows": 0, "written_rows": 0, "dropped_rows": 0, "blocked_calls": 0, "flushes": 0, "errors": 0}
+        self._writer: Optional[threading.Thread] = None
+        self._closing = False
+        self._flush_requested = False
+        if async_writes:
+            self._writer = threading.Thread(target=self._write_loop, name="sentinel-memory-writer", daemon=True)
+            self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Only the owning thread uses a connection; close() may run elsewhere
+        conn = sqlite3.connect(self.db_path, timeout=self.profile.busy_timeout_ms / 1000, check_same_thread=False)
+        # Lets dropped partitions hand their pages back to the OS. Only takes
+        # effect on a new file (or on VACUUM), and must precede journal_mode,
+        # which initializes the file header.
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute(f"PRAGMA journal_mode={self.profile.journal_mode}")
+        conn.execute(f"PRAGMA synchronous={self.profile.synchronous}")
+        conn.execute(f"PRAGMA cache_size=-{self.profile.cache_size_kb}")
+        conn.execute(f"PRAGMA mmap_size={self.profile.mmap_size}")
+        conn.execute(f"PRAGMA busy_timeout={self.profile.busy_timeout_ms}")
+        conn.execute(f"PRAGMA wal_autocheckpoint={self.profile.wal_autocheckpoint}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def _connection(self) -> sqlite3.Connection:
+        """The calling thread's connection, opened on first use."""
+        local = self._local
+        handle = getattr(local, "handle", None)
+        if handle is None:
+            conn = self._connect()
+            with self._lock:
+                self._connections.add(conn)
+            handle = local.handle = _ThreadConnection(conn, self._connections, self._lock)
+        return handle.conn
+
+    def close(self):
+        """Drain the write queue, stop the writer and close every connection; later calls reconnect on demand."""
+        if self._writer is not None:
+            with self._cond:
+                self._closing = True
+                self._cond.notify_all()
+            self._writer.join()
+            self._writer = None
+
+        # Other threads' handles cannot be cleared; a fresh local makes every thread reconnect.
+        # Swapped outside the lock: dropping this thread's handle runs its finalizer, which takes it.
+        self._local = threading.local()
+        with self._lock:
+            connections = list(self._connections)
+        for conn in connections:
+            _release_connection(conn, self._connections, self._lock)
+
+    def __enter__(self) -> "SovereignMemory":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     def _initialize_vault(self):
         """Initialize the database schema if it doesn't exist."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Table: Situational Detections
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS detections (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        camera_id INTEGER,
-                        label TEXT,
-                        confidence REAL,
-                        bbox_json TEXT,
-                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-
-                # Table: Institutional Alerts
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS alerts (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        camera_id INTEGER,
-                        title TEXT,
-                        message TEXT,
-                        severity TEXT,
-                        timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                conn.commit()
+            conn = self._connection()
+            with conn:
+                conn.execute("CREATE TABLE IF NOT EXISTS labels (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL)")
+            self._label_ids.update((name, label_id) for label_id, name in conn.execute("SELECT id, name FROM labels"))
+            for table in PARTITION_SCHEMAS:
+                self._known_partitions.update(self._partitions(conn, table))
+            migrated = self._migrate_unpartitioned(conn)
+            if self._migrate_json_detections(conn) or migrated:
+                # A full VACUUM would rewrite the whole file inside the constructor; see vacuum()
+                conn.executescript("PRAGMA incremental_vacuum")
+                if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                    logger.info("Legacy vault layout converted; run vacuum() once to enable incremental space reclamation")
             logger.info(f"Sovereign Memory Vault initialized at {self.db_path}")
         except Exception as e:
             logger.error(f"Vault Initialization Error: {e}")
 
-    def save_detection(self, camera_id: int, label: str, confidence: float, bbox: tuple):
+    def vacuum(self):
+        """
+        Rebuild the database file, returning all free pages to the OS.
+        Also switches vaults created before incremental auto-vacuum over to it.
+        Takes an exclusive lock for the duration, so run it during maintenance.
+        """
+        self._connection().execute("VACUUM")
+
+    def _partitions(self, conn: sqlite3.Connection, table: str) -> List[str]:
+        """Existing partition names of a logical table, oldest first."""
+        rows = conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name GLOB ?",
+            (f"{table}_[0-9][0-9][0-9][0-9][0-9][0-9][0-9][0-9]",),
+        )
+        return sorted(name for (name,) in rows)
+
+    def _ensure_partition(self, conn: sqlite3.Connection, table: str, day: str) -> str:
+        """Create the table's partition for day (YYYYMMDD) if needed; returns its name."""
+        name = f"{table}_{day}"
+        if name in self._known_partitions:
+            return name
+
+        columns, indexes = PARTITION_SCHEMAS[table]
+        first_id = datetime.strptime(day, "%Y%m%d").toordinal() * PARTITION_ID_STRIDE
+        with conn:
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {name} (id INTEGER PRIMARY KEY AUTOINCREMENT, {columns})")
+            for index_columns in indexes:
+                suffix = index_columns.replace(", ", "_")
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_{suffix} ON {name} ({index_columns})")
+            conn.execute(
+                "INSERT INTO sqlite_sequence (name, seq) SELECT ?, ? "
+                "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = ?)",
+                (name, first_id, name),
+            )
+        with self._lock:
+            self._known_partitions.add(name)
+        return name
+
+    def _migrate_unpartitioned(self, conn: sqlite3.Connection) -> bool:
+        """Move rows of pre-partitioning detections/alerts tables into day partitions."""
+        migrated = False
+        for table, (columns, _) in PARTITION_SCHEMAS.items():
+            if table == "detections":
+                # Predates the compact layout; converted by _migrate_json_detections
+                continue
+            exists = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+            ).fetchone()
+            if not exists:
+                continue
+
+            names = ", ".join(column.split()[0] for column in columns.split(", "))
+            days = [
+                _partition_day(timestamp)
+                for (timestamp,) in conn.execute(f"SELECT DISTINCT substr(timestamp, 1, 10) FROM {table}")
+                if timestamp
+            ]
+            total = conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            try:
+                partitions = {day: self._ensure_partition(conn, table, day) for day in days}
+                # Copy and drop commit together, and only if every row found a partition
+                with conn:
+                    copied = 0
+                    for day, partition in partitions.items():
+                        start = datetime.strptime(day, "%Y%m%d")
+                        copied += conn.execute(
+                            f"INSERT INTO {partition} ({names}) SELECT {names} FROM {table} "
+                            "WHERE timestamp >= ? AND timestamp < ? ORDER BY timestamp, id",
+                            (start.strftime("%Y-%m-%d"), (start + timedelta(days=1)).strftime("%Y-%m-%d")),
+                        ).rowcount
+                    if copied != total:
+                        raise ValueError(f"{total - copied} of {total} rows have no usable timestamp")
+                    conn.execute(f"DROP TABLE {table}")
+            except ValueError as e:
+                logger.error(f"Migration of table {table} skipped, table left in place: {e}")
+                continue
+            logger.info(f"Migrated table {table} into {len(days)} daily partitions")
+            migrated = True
+        return migrated
+
+    def _migrate_json_detections(self, conn: sqlite3.Connection, chunk_size: int = 10000) -> bool:
+        """
+        Convert detections stored with label text, bbox_json and text
+        timestamps (the unpartitioned table or daily partitions) into the
+        compact layout. Each source table is copied and dropped in one
+        transaction, so an interrupted migration resumes on the next open.
+        Rows without a parseable timestamp or a four-number bbox cannot be
+        placed or converted; they are skipped and counted in the log.
+        """
+        sources = [name for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND (name = 'detections' OR name GLOB 'detections_*_json')"
+        )]
+        for partition in self._partitions(conn, "detections"):
+            columns = [row[1] for row in conn.execute(f"PRAGMA table_info({partition})")]
+            if "bbox_json" in columns:
+                # Frees the partition name for its compact replacement
+                conn.execute(f"ALTER TABLE {partition} RENAME TO {partition}_json")
+                with self._lock:
+                    self._known_partitions.discard(partition)
+                sources.append(f"{partition}_json")
+
+        for source in sources:
+            # date() is NULL for timestamps SQLite cannot parse, like strftime() below
+            days = [
+                day.replace("-", "")
+                for (day,) in conn.execute(f"SELECT DISTINCT date(timestamp) FROM {source}")
+                if day
+            ]
+            partitions = {day: self._ensure_partition(conn, "detections", day) for day in days}
+            labels = [label for (label,) in conn.execute(f"SELECT DISTINCT label FROM {source}")]
+            label_ids = dict(zip(labels, self._label_id_list(conn, [str(label) for label in labels])))
+
+            rows = conn.cursor().execute(
+                "SELECT camera_id, label, confidence, bbox_json, CAST(strftime('%s', timestamp) AS INTEGER) * 1000 "
+                f"FROM {source} ORDER BY timestamp, id"
+            )
+            copied = skipped = 0
+            with conn:
+                while True:
+                    chunk = rows.fetchmany(chunk_size)
+                    if not chunk:
+                        break
+                    by_day: Dict[str, List[DetectionRow]] = {}
+                    for camera_id, label, confidence, bbox_json, ts_ms in chunk:
+                        try:
+                            x1, y1, x2, y2 = (float(value) for value in json.loads(bbox_json))
+                        except (TypeError, ValueError):
+                            ts_ms = None
+                        if ts_ms is None:
+                            skipped += 1
+                            continue
+                        by_day.setdefault(_partition_day_ms(ts_ms), []).append(
+                            (camera_id, label_ids[label], confidence, x1, y1, x2, y2, None, ts_ms)
+                        )
+                        copied += 1
+                    for day, day_rows in by_day.items():
+                        self._insert_rows(conn, partitions[day], day_rows)
+                conn.execute(f"DROP TABLE {source}")
+            logger.info(f"Converted {copied} detections from {source} to the compact layout")
+            if skipped:
+                logger.warning(f"Skipped {skipped} detections in {source} without a valid timestamp or bbox")
+        return bool(sources)
+
+    def _label_id_list(self, conn: sqlite3.Connection, names: Sequence[str]) -> List[int]:
+        """Dictionary ids of label names, registering unseen labels."""
+        missing = set(names).difference(self._label_ids)
+        if missing:
+            with conn:
+                conn.executemany("INSERT OR IGNORE INTO labels (name) VALUES (?)", [(name,) for name in missing])
+            placeholders = ", ".join("?" * len(missing))
+            found = conn.execute(f"SELECT name, id FROM labels WHERE name IN ({placeholders})", list(missing))
+            with self._lock:
+                self._label_ids.update(found)
+        label_ids = self._label_ids
+        return [label_ids[name] for name in names]
+
+    def _lookup_label_id(self, conn: sqlite3.Connection, name: str) -> Optional[int]:
+        """Dictionary id of a label, or None if it was never stored."""
+        label_id = self._label_ids.get(name)
+        if label_id is None:
+            row = conn.execute("SELECT id FROM labels WHERE name = ?", (name,)).fetchone()
+            label_id = row[0] if row else None
+        return label_id
+
+    def save_detection(self, camera_id: int, label: str, confidence: float, bbox: tuple, track_id: Optional[int] = None):
         """Persist a single intelligence detection."""
+        self.save_detections(camera_id, [Detection(-1, label, confidence, bbox, track_id)])
+
+    def save_detections(self, camera_id: int, detections: Union[Sequence[Detection], DetectionBatch]):
+        """Persist all detections of one frame, queued when the background writer is enabled."""
+        if len(detections) == 0:
+            return
+        if self._writer is None:
+            self._insert_detections([(camera_id, detections, time.time())])
+            return
+
+        n = len(detections)
+        with self._cond:
+            if self._queued_rows + n > self.max_queue_rows:
+                if self.overflow == "drop":
+                    self._stats["dropped_rows"] += n
+                    return
+                self._stats["blocked_calls"] += 1
+                while self._queued_rows + n > self.max_queue_rows and self._queued_rows and not self._closing:
+                    self._cond.wait()
+            self._queue.append((camera_id, detections, time.time()))
+            self._queued_rows += n
+            self._stats["queued_rows"] += n
+            if self._queued_rows >= self.flush_rows:
+                self._cond.notify_all()
+
+    def _detection_rows(self, conn: sqlite3.Connection, items) -> Dict[str, List[DetectionRow]]:
+        """Queued items as insert rows, grouped by daily partition."""
+        by_day: Dict[str, List[DetectionRow]] = {}
+        for camera_id, detections, created in items:
+            ts_ms = int(created * 1000)
+            if isinstance(detections, DetectionBatch):
+                labels = detections.class_names
+                confidences = detections.confidences.tolist()
+                bboxes = detections.bboxes.tolist()
+                tracks = [None if t == DetectionBatch.NO_TRACK else t for t in detections.track_ids.tolist()]
+            else:
+                labels = [d.class_name for d in detections]
+                confidences = [float(d.confidence) for d in detections]
+                bboxes = [tuple(map(float, d.bbox)) for d in detections]
+                tracks = [d.track_id for d in detections]
+            by_day.setdefault(_partition_day_ms(ts_ms), []).extend(
+                (camera_id, label_id, confidence, x1, y1, x2, y2, track_id, ts_ms)
+                for label_id, confidence, (x1, y1, x2, y2), track_id
+                in zip(self._label_id_list(conn, labels), confidences, bboxes, tracks)
+            )
+        return by_day
+
+    def _insert_rows(self, conn: sqlite3.Connection, partition: str, rows: List[DetectionRow]):
+        conn.executemany(
+            f"INSERT INTO {partition} (camera_id, label_id, confidence, x1, y1, x2, y2, track_id, ts_ms) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    def _insert_detections(self, items) -> int:
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "INSERT INTO detections (camera_id, label, confidence, bbox_json) VALUES (?, ?, ?, ?)",
-                    (camera_id, label, confidence, json.dumps(bbox))
-                )
-                conn.commit()
+            conn = self._connection()
+            by_day = self._detection_rows(conn, items)
+            partitions = {day: self._ensure_partition(conn, "detections", day) for day in by_day}
+            with conn:
+                for day, rows in by_day.items():
+                    self._insert_rows(conn, partitions[day], rows)
+            return sum(len(rows) for rows in by_day.values())
         except Exception as e:
             logger.error(f"Detection Persistence Error: {e}")
+            with self._cond:
+                self._stats["errors"] += 1
+            return 0
+
+    def _write_loop(self):
+        """Writer thread: drain the queue in large transactions on size or time thresholds."""
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while self._queued_rows < self.flush_rows and not (self._closing or self._flush_requested):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if not self._queue and self._closing:
+                    return
+                self._flush_requested = False
+                items = list(self._queue)
+                self._queue.clear()
+                self._in_flight = self._queued_rows
+                self._queued_rows = 0
+                # Blocked producers may proceed while this batch is written
+                self._cond.notify_all()
+
+            written = self._insert_detections(items) if items else 0
+
+            # Counters change under the condition, like the queue, so get_stats() sees a consistent snapshot
+            with self._cond:
+                if items:
+                    self._stats["written_rows"] += written
+                    self._stats["flushes"] += 1
+                self._in_flight = 0
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued detection is written. Returns False on timeout."""
+        if self._writer is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._queued_rows or self._in_flight:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                # Wake the writer early instead of waiting for its interval
+                self._flush_requested = True
+                self._cond.notify_all()
+                self._cond.wait(remaining)
+        return True
+
+    def get_stats(self) -> Dict[str, int]:
+        """Write path counters, including rows dropped on queue overflow."""
+        with self._cond:
+            return {**self._stats, "queue_rows": self._queued_rows + self._in_flight}
 
     def save_alert(self, camera_id: int, title: str, message: str, severity: str):
         """Persist a high-severity alert."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "INSERT INTO alerts (camera_id, title, message, severity) VALUES (?, ?, ?, ?)",
-                    (camera_id, title, message, severity)
+            timestamp = _sql_time(datetime.now(timezone.utc))
+            conn = self._connection()
+            partition = self._ensure_partition(conn, "alerts", _partition_day(timestamp))
+            with conn:
+                conn.execute(
+                    f"INSERT INTO {partition} (camera_id, title, message, severity, timestamp) VALUES (?, ?, ?, ?, ?)",
+                    (camera_id, title, message, severity, timestamp)
                 )
-                conn.commit()
         except Exception as e:
             logger.error(f"Alert Persistence Error: {e}")
 
-    def query_detections(self, camera_id: Optional[int] = None, hours: int = 24) -> List[Dict[str, Any]]:
-        """Retrieve historical intelligence detections."""
+    def _detection_filter(
+        self,
+        camera_id: Optional[int],
+        since_ms: int,
+        until_ms: Optional[int],
+        label_id: Optional[int],
+        min_confidence: Optional[float],
+    ) -> Tuple[str, List[Any]]:
+        clauses, params = ["d.ts_ms > ?"], [since_ms]
+        if until_ms is not None:
+            clauses.append("d.ts_ms <= ?")
+            params.append(until_ms)
+        if camera_id is not None:
+            clauses.append("d.camera_id = ?")
+            params.append(camera_id)
+        if label_id is not None:
+            clauses.append("d.label_id = ?")
+            params.append(label_id)
+        if min_confidence is not None:
+            clauses.append("d.confidence >= ?")
+            params.append(min_confidence)
+        return " AND ".join(clauses), params
+
+    def query_detections_page(
+        self,
+        camera_id: Optional[int] = None,
+        hours: float = 24,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        label: Optional[str] = None,
+        min_confidence: Optional[float] = None,
+        page_size: int = 1000,
+        cursor: Optional[PageCursor] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[PageCursor]]:
+        """
+        One page of detections in (ts_ms, id) order.
+        Pass the returned cursor to fetch the next page; it is None after the last one.
+        Database errors propagate, so a failed read is never mistaken for the end of the data.
+        Pages are keyset-based, so deep pages cost the same as the first.
+        Only the daily partitions overlapping the window (and not before the cursor) are read.
+
+        Rows are dicts with id, camera_id, label, confidence, bbox (x1, y1,
+        x2, y2), track_id (None if untracked) and ts_ms (UTC epoch milliseconds).
+        """
+        since_ms = _epoch_ms(since or datetime.now(timezone.utc) - timedelta(hours=hours))
+        until_ms = _epoch_ms(until) if until is not None else None
+
+        rows: List[Dict[str, Any]] = []
+        conn = self._connection()
+        label_id = None
+        if label is not None:
+            label_id = self._lookup_label_id(conn, label)
+            if label_id is None:
+                return [], None
+        where, params = self._detection_filter(camera_id, since_ms, until_ms, label_id, min_confidence)
+
+        first_day = _partition_day_ms(max(since_ms, cursor[0]) if cursor is not None else since_ms)
+        last_day = _partition_day_ms(until_ms) if until_ms is not None else None
+        for partition in self._partitions(conn, "detections"):
+            day = partition.rsplit("_", 1)[1]
+            if day < first_day or (last_day is not None and day > last_day):
+                continue
+
+            # Rows of earlier partitions all sort before the cursor
+            partition_where, partition_params = where, list(params)
+            if cursor is not None and day == _partition_day_ms(cursor[0]):
+                partition_where += " AND (d.ts_ms, d.id) > (?, ?)"
+                partition_params.extend(cursor)
+            partition_params.append(page_size - len(rows))
+
+            try:
+                fetched = conn.execute(
+                    "SELECT d.id, d.camera_id, l.name, d.confidence, d.x1, d.y1, d.x2, d.y2, d.track_id, d.ts_ms "
+                    f"FROM {partition} AS d LEFT JOIN labels AS l ON l.id = d.label_id "
+                    f"WHERE {partition_where} ORDER BY d.ts_ms, d.id LIMIT ?",
+                    partition_params,
+                ).fetchall()
+            except sqlite3.OperationalError as e:
+                # Dropped by retention since it was listed
+                if "no such table" not in str(e):
+                    raise
+                continue
+            rows.extend(
+                {
+                    "id": row_id,
+                    "camera_id": row_camera_id,
+                    "label": name,
+                    "confidence": confidence,
+                    "bbox": (x1, y1, x2, y2),
+                    "track_id": track_id,
+                    "ts_ms": ts_ms,
+                }
+                for row_id, row_camera_id, name, confidence, x1, y1, x2, y2, track_id, ts_ms in fetched
+            )
+            if len(rows) == page_size:
+                break
+
+        next_cursor = (rows[-1]["ts_ms"], rows[-1]["id"]) if len(rows) == page_size else None
+        return rows, next_cursor
+
+    def iter_detections(
+        self,
+        camera_id: Optional[int] = None,
+        hours: float = 24,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        label: Optional[str] = None,
+        min_confidence: Optional[float] = None,
+        chunk_size: int = 1000,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream matching detections in (ts_ms, id) order, chunk_size rows at a time.
+        No read transaction is held between chunks, so writers and WAL checkpoints are not stalled.
+        """
+        cursor = None
+        while True:
+            rows, cursor = self.query_detections_page(
+                camera_id, hours, since, until, label, min_confidence, chunk_size, cursor
+            )
+            yield from rows
+            if cursor is None:
+                return
+
+    def query_detections(
+        self,
+        camera_id: Optional[int] = None,
+        hours: float = 24,
+        label: Optional[str] = None,
+        min_confidence: Optional[float] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Retrieve historical intelligence detections (at most limit rows; see iter_detections for large ranges)."""
         try:
-            since = (datetime.now() - timedelta(hours=hours)).strftime("%Y-%m-%d %H:%M:%S")
-            query = "SELECT camera_id, label, confidence, bbox_json, timestamp FROM detections WHERE timestamp > ?"
-            params = [since]
-            
-            if camera_id is not None:
-                query += " AND camera_id = ?"
-                params.append(camera_id)
-
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                cursor.execute(query, params)
-                return [dict(row) for row in cursor.fetchall()]
+            if limit is not None:
+                return self.query_detections_page(camera_id, hours, None, None, label, min_confidence, limit)[0]
+            return list(self.iter_detections(camera_id, hours, None, None, label, min_confidence))
         except Exception as e:
             logger.error(f"Query Execution Error: {e}")
             return []
 
     def purge_old_data(self, retention_days: int = 7):
-        """Institutional data retention protocol. Purges data older than the retention period."""
+        """
+        Institutional data retention protocol. Drops the daily partitions
+        older than the retention period; the cost does not depend on row
+        counts. Retention is applied per UTC day: rows in the partition that
+        straddles the cutoff are kept until that whole day has expired.
+        """
         try:
-            cutoff = (datetime.now() - timedelta(days=retention_days)).strftime("%Y-%m-%d %H:%M:%S")
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM detections WHERE timestamp < ?", (cutoff,))
-                cursor.execute("DELETE FROM alerts WHERE timestamp < ?", (cutoff,))
-                conn.commit()
-            logger.info(f"Data Retention Protocol: Purged entries older than {retention_days} days.")
+            cutoff = _partition_day(_sql_time(datetime.now(timezone.utc) - timedelta(days=retention_days)))
+            conn = self._connection()
+            expired = [
+                partition
+                for table in PARTITION_SCHEMAS
+                for partition in self._partitions(conn, table)
+                if partition.rsplit("_", 1)[1] < cutoff
+            ]
+            with conn:
+                for partition in expired:
+                    conn.execute(f"DROP TABLE IF EXISTS {partition}")
+            with self._lock:
+                self._known_partitions.difference_update(expired)
+            # Return the freed pages to the filesystem (a no-op unless auto_vacuum is INCREMENTAL);
+            # executescript steps the pragma to completion, execute() frees a single page
+            conn.executescript("PRAGMA incremental_vacuum")
+            logger.info(f"Data Retention Protocol: Dropped {len(expired)} partitions older than {retention_days} days.")
         except Exception as e:
             logger.error(f"Retention Protocol Failure: {e}")
@@ -19,7 +19,27 @@ class TechnicalStream:
     metadata: Dict[str, Any] = field(default_factory=dict)
     is_active: bool = False
     reconnect_attempts: int = 0
-    
+
+    # Throughput Metrics
+    frames_processed: int = 0
+    frames_dropped: int = 0
+    queue_depth: int = 0
+    throughput_fps: float = 0.0
+    _window_start: float = field(default_factory=time.monotonic, repr=False)
+    _window_frames: int = field(default=0, repr=False)
+
+    def record_processed(self, window: float = 1.0):
+        """Account for one processed frame and refresh the rolling FPS estimate."""
+        self.frames_processed += 1
+        self._window_frames += 1
+
+        now = time.monotonic()
+        elapsed = now - self._window_start
+        if elapsed >= window:
+            self.throughput_fps = self._window_frames / elapsed
+            self._window_start = now
+            self._window_frames = 0
+
     def get_uptime(self) -> float:
         """Calculate the duration of the current operational session."""
         if not self.is_active:
@@ -34,5 +54,9 @@ class TechnicalStream:
             "status": "OPERATIONAL" if self.is_active else "IDLE",
             "uptime": f"{self.get_uptime():.2f}s",
             "source_type": self.source.split('://')[0] if '://' in self.source else "local",
-            "name": self.name or f"UNIT-{self.camera_id}"
+            "name": self.name or f"UNIT-{self.camera_id}",
+            "throughput_fps": round(self.throughput_fps, 2),
+            "frames_processed": self.frames_processed,
+            "frames_dropped": self.frames_dropped,
+            "queue_depth": self.queue_depth,
         }
@@ -24,7 +24,7 @@ async def run_complete_demo():
     # 1. Initialize Components
     detector = YOLODetector(confidence_threshold=0.4)
     recorder = VideoRecorder(output_dir="./sentinel_evidence")
-    memory = SovereignMemory()
+    memory = SovereignMemory(async_writes=True)
     
     # 2. Configure Alerting (Example using Mock values)
     alert_manager = AlertManager()
@@ -51,13 +51,7 @@ async def run_complete_demo():
         recorder.write(frame, trigger=has_person)
         
         # 5. Sovereign Memory Persistence
-        for det in detections:
-            memory.save_detection(
-                camera_id=202,
-                label=det.class_name,
-                confidence=det.confidence,
-                bbox=det.bbox
-            )
+        memory.save_detections(camera_id=202, detections=detections)
 
         if has_person:
             # 6. Alert Dispatch
@@ -92,8 +86,10 @@ async def run_complete_demo():
         
         # Institutional Summary from Memory
         logger.info("Operational session finalized.")
+        memory.flush()
         recent_activity = memory.query_detections(hours=1)
         logger.info(f"Sovereign Memory Report: {len(recent_activity)} situational events logged in the last hour.")
+        memory.close()
 
 if __name__ == "__main__":
     try:
@@ -44,13 +44,16 @@ async def run_surveillance_session():
     manager.set_detector(detector)
     
     # 3. Register a Technical Stream
-    # Note: Stream ingestion logic will be fully implemented in v0.2.0
-    await manager.start_stream(
+    started = await manager.start_stream(
         camera_id=101, 
         source="rtsp://secure-intelligence-feed.local/unit-1"
     )
     
-    logger.info("Surveillance session initiated successfully.")
+    if started:
+        logger.info("Surveillance session initiated successfully.")
+        await manager.join()
+
+    await manager.shutdown()
 
 if __name__ == "__main__":
     asyncio.run(run_surveillance_session())
@@ -0,0 +1,206 @@
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from ai.base import Detection
+from core.memory import SovereignMemory
+
+# Midday keeps every test row of a day inside that day's partition
+NOON = datetime.now(timezone.utc).replace(hour=12, minute=0, second=0, microsecond=0)
+
+def _tables(db_path) -> set:
+    with sqlite3.connect(db_path) as conn:
+        return {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+def _sql_time(value: datetime) -> str:
+    return value.strftime("%Y-%m-%d %H:%M:%S")
+
+def _create_baseline_vault(db_path, days: int = 3, per_day: int = 50):
+    """Single-table layout with label text, bbox_json and text timestamps."""
+    conn = sqlite3.connect(db_path)
+    conn.execute("""
+        CREATE TABLE detections (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            camera_id INTEGER,
+            label TEXT,
+            confidence REAL,
+            bbox_json TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE alerts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            camera_id INTEGER,
+            title TEXT,
+            message TEXT,
+            severity TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    rows = []
+    for day in range(days):
+        for i in range(per_day):
+            timestamp = _sql_time(NOON - timedelta(days=day, minutes=i))
+            rows.append((i % 3, "person" if i % 2 else "car", 0.5, json.dumps([0.1, 0.2, 0.3, 0.4]), timestamp))
+    conn.executemany(
+        "INSERT INTO detections (camera_id, label, confidence, bbox_json, timestamp) VALUES (?, ?, ?, ?, ?)", rows
+    )
+    conn.execute(
+        "INSERT INTO alerts (camera_id, title, message, severity, timestamp) VALUES (1, 'Breach', 'Zone 1', 'high', ?)",
+        (_sql_time(NOON - timedelta(days=1)),),
+    )
+    conn.commit()
+    conn.close()
+    return rows
+
+def _insert_at(memory: SovereignMemory, camera_id: int, when: datetime, n: int = 1):
+    detections = [Detection(0, "person", 0.9, (0.1, 0.2, 0.3, 0.4), track_id=i) for i in range(n)]
+    memory._insert_detections([(camera_id, detections, when.timestamp())])
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "vault.db"
+
+def test_migrates_baseline_vault(db_path):
+    rows = _create_baseline_vault(db_path)
+
+    with SovereignMemory(db_path) as memory:
+        detections = list(memory.iter_detections(hours=24 * 4, chunk_size=40))
+        conn = memory._connection()
+        # Existing files keep their auto_vacuum mode until an explicit vacuum()
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 0
+        memory.vacuum()
+        assert conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2  # INCREMENTAL
+
+    tables = _tables(db_path)
+    assert "detections" not in tables and "alerts" not in tables
+    assert len([t for t in tables if t.startswith("detections_")]) == 3
+    assert any(t.startswith("alerts_") for t in tables)
+
+    assert len(detections) == len(rows)
+    assert {d["label"] for d in detections} == {"person", "car"}
+    assert all(d["bbox"] == (0.1, 0.2, 0.3, 0.4) and d["track_id"] is None for d in detections)
+    expected_ms = sorted(int(datetime.strptime(r[4], "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).timestamp() * 1000) for r in rows)
+    assert [d["ts_ms"] for d in detections] == expected_ms
+
+def test_unpartitioned_table_kept_when_rows_cannot_be_placed(db_path):
+    _create_baseline_vault(db_path, days=1, per_day=5)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("INSERT INTO alerts (camera_id, title, message, severity, timestamp) VALUES (2, 'Breach', 'Zone 2', 'high', NULL)")
+
+    with SovereignMemory(db_path) as memory:
+        conn = memory._connection()
+        partitions = memory._partitions(conn, "alerts")
+        assert sum(conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0] for name in partitions) == 0
+
+    assert "alerts" in _tables(db_path)
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM alerts").fetchone()[0] == 2
+
+def test_migration_resumes_and_skips_bad_rows(db_path):
+    day = NOON - timedelta(days=1)
+    partition = f"detections_{day:%Y%m%d}"
+    conn = sqlite3.connect(db_path)
+    # Daily partition in the bbox_json layout, renamed by an interrupted migration
+    conn.execute(
+        f"CREATE TABLE {partition}_json (id INTEGER PRIMARY KEY AUTOINCREMENT, camera_id INTEGER, "
+        "label TEXT, confidence REAL, bbox_json TEXT, timestamp DATETIME DEFAULT CURRENT_TIMESTAMP)"
+    )
+    rows = [(1, "person", 0.8, json.dumps([0.1, 0.2, 0.3, 0.4]), _sql_time(day - timedelta(seconds=i))) for i in range(20)]
+    bad_rows = [
+        (1, "person", 0.8, "not json", _sql_time(day)),
+        (1, "person", 0.8, None, _sql_time(day)),
+        (1, "person", 0.8, json.dumps([0.1, 0.2]), _sql_time(day)),
+        (1, "person", 0.8, json.dumps([0.1, 0.2, 0.3, 0.4]), "yesterday"),
+        (1, "person", 0.8, json.dumps([0.1, 0.2, 0.3, 0.4]), None),
+    ]
+    conn.executemany(
+        f"INSERT INTO {partition}_json (camera_id, label, confidence, bbox_json, timestamp) VALUES (?, ?, ?, ?, ?)",
+        rows + bad_rows,
+    )
+    conn.commit()
+    conn.close()
+
+    # Unconvertible rows are skipped one by one instead of aborting the vault
+    with SovereignMemory(db_path) as memory:
+        detections = list(memory.iter_detections(hours=72))
+
+    assert f"{partition}_json" not in _tables(db_path)
+    assert len(detections) == len(rows)
+    assert all(d["camera_id"] == 1 and d["label"] == "person" for d in detections)
+
+def test_keyset_pagination_spans_partitions(db_path):
+    with SovereignMemory(db_path) as memory:
+        for days_ago in (3, 2, 1, 0):
+            _insert_at(memory, 7, NOON - timedelta(days=days_ago, minutes=5), n=13)
+        assert len(memory._partitions(memory._connection(), "detections")) == 4
+
+        pages, cursor = [], None
+        while True:
+            page, cursor = memory.query_detections_page(camera_id=7, hours=24 * 5, page_size=10, cursor=cursor)
+            pages.append(page)
+            if cursor is None:
+                break
+
+        rows = [row for page in pages for row in page]
+        assert len(rows) == 52
+        assert all(len(page) == 10 for page in pages[:-1])
+        keys = [(row["ts_ms"], row["id"]) for row in rows]
+        assert keys == sorted(keys) and len(set(keys)) == len(keys)
+        # Ids stay unique and time-ordered across days
+        assert [row["id"] for row in rows] == sorted(row["id"] for row in rows)
+
+        window = memory.query_detections_page(
+            since=NOON - timedelta(days=2, hours=1), until=NOON - timedelta(days=1), page_size=100
+        )[0]
+        assert len(window) == 26
+
+def test_purge_drops_expired_partitions(db_path):
+    with SovereignMemory(db_path) as memory:
+        for days_ago in range(10):
+            _insert_at(memory, 1, NOON - timedelta(days=days_ago), n=200)
+        conn = memory._connection()
+        old_alerts = memory._ensure_partition(conn, "alerts", f"{NOON - timedelta(days=9):%Y%m%d}")
+        memory.save_alert(1, "Breach", "Zone 1", "high")
+
+        memory.purge_old_data(retention_days=3)
+
+        detections = memory._partitions(conn, "detections")
+        cutoff = f"{NOON - timedelta(days=3):%Y%m%d}"
+        assert len(detections) == 4
+        assert all(name.rsplit("_", 1)[1] >= cutoff for name in detections)
+        assert old_alerts not in memory._partitions(conn, "alerts")
+        assert len(memory._partitions(conn, "alerts")) == 1
+        assert len(memory.query_detections(hours=24 * 10)) == 4 * 200
+        # Freed pages went back to the filesystem
+        assert conn.execute("PRAGMA freelist_count").fetchone()[0] == 0
+
+        # Writes keep working after their partition set changed
+        _insert_at(memory, 1, NOON)
+        assert len(memory.query_detections(hours=1)) == 201
+
+def test_page_errors_propagate(db_path):
+    with SovereignMemory(db_path) as memory:
+        _insert_at(memory, 1, NOON)
+        memory._connection().execute(f"ALTER TABLE detections_{NOON:%Y%m%d} RENAME COLUMN ts_ms TO ts")
+
+        with pytest.raises(sqlite3.OperationalError):
+            memory.query_detections_page(hours=24)
+        with pytest.raises(sqlite3.OperationalError):
+            list(memory.iter_detections(hours=24))
+        # The legacy list API keeps logging and returning nothing
+        assert memory.query_detections(hours=24) == []
+
+def test_thread_connections_close_with_their_thread(db_path):
+    with SovereignMemory(db_path) as memory:
+        for _ in range(5):
+            worker = threading.Thread(target=memory.query_detections)
+            worker.start()
+            worker.join()
+        # Only the constructing thread's connection is still open
+        assert len(memory._connections) == 1
+    assert not memory._connections
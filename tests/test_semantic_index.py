@@ -0,0 +1,126 @@
+import json
+
+import numpy as np
+
+from ai.quantization import Int8Codec, PQCodec
+from ai.semantic import EMBEDDINGS_FILE, EXTRAS_LOG, MANIFEST_FILE, STAGING_COLUMN, SemanticEngine
+
+DIM = 16
+T0 = 1767225600.0  # 2026-01-01
+
+def _embeddings(n: int, seed: int = 0) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((n, DIM)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def _fill(engine: SemanticEngine, vectors: np.ndarray, first: int = 0):
+    for i, vector in enumerate(vectors, start=first):
+        engine._append_entry(vector, i % 3, T0 + i, {"zone": f"z{i}"} if i % 2 == 0 else None)
+
+def _open(index_dir, **kwargs) -> SemanticEngine:
+    return SemanticEngine(str(index_dir), flush_every=10**6, **kwargs)
+
+def test_reload_restores_committed_entries(tmp_path):
+    vectors = _embeddings(50)
+    engine = _open(tmp_path)
+    _fill(engine, vectors)
+    engine.close()
+
+    manifest = json.loads((tmp_path / MANIFEST_FILE).read_text())
+    assert manifest["count"] == 50 and manifest["next_row_id"] == 50
+
+    reloaded = _open(tmp_path)
+    assert len(reloaded) == 50
+    np.testing.assert_array_equal(np.asarray(reloaded.embedding_matrix), vectors)
+    assert reloaded._data.row_ids.view.tolist() == list(range(50))
+    assert reloaded._data.extras[4] == {"zone": "z4"} and 5 not in reloaded._data.extras
+
+    reloaded._encode_text = lambda text: vectors[7]
+    best = reloaded.query("anything", top_k=1)[0]
+    assert best.row_id == 7 and best.camera_id == 1
+    assert reloaded.query("anything", top_k=5, where={"zone": "z8"})[0].row_id == 8
+    reloaded.close()
+
+def test_uncommitted_tail_is_discarded(tmp_path):
+    vectors = _embeddings(30)
+    engine = _open(tmp_path)
+    _fill(engine, vectors[:20])
+    engine.flush()
+
+    # Rows and extras written after the last manifest commit, then a crash
+    _fill(engine, vectors[20:], first=20)
+    engine._data.flush()
+
+    reloaded = _open(tmp_path)
+    assert len(reloaded) == 20
+    assert max(reloaded._data.extras) == 18
+    log_rows = [json.loads(line)["row"] for line in (tmp_path / EXTRAS_LOG).read_text().splitlines()]
+    assert max(log_rows) < 20
+
+    # Row ids continue after the committed rows, not the discarded ones
+    assert reloaded._append_entry(vectors[25], 0, T0 + 25) == 20
+    reloaded.close()
+
+def test_where_on_column_keys_filters_columns(tmp_path):
+    vectors = _embeddings(12)
+    engine = _open(tmp_path, persist=False)
+    _fill(engine, vectors)
+    engine._encode_text = lambda text: vectors[4]
+
+    best = engine.query("anything", top_k=1)[0]
+    assert best.row_id == 4
+    same = engine.query("anything", top_k=12, where={"timestamp": best.metadata["timestamp"]})
+    assert [r.row_id for r in same] == [4]
+
+    by_camera = engine.query("anything", top_k=12, where={"camera_id": 1})
+    assert sorted(r.row_id for r in by_camera) == [1, 4, 7, 10]
+    assert [r.row_id for r in engine.query("anything", top_k=12, camera_ids=[0, 1], where={"camera_id": 1, "zone": "z4"})] == [4]
+    assert engine.query("anything", top_k=12, camera_ids=2, where={"camera_id": 1}) == []
+    engine.close()
+
+def test_codec_restored_from_manifest(tmp_path):
+    vectors = _embeddings(40)
+    engine = _open(tmp_path, codec=Int8Codec())
+    _fill(engine, vectors)
+    engine.close()
+    assert (tmp_path / EMBEDDINGS_FILE.format(codec="i8")).exists()
+
+    reloaded = _open(tmp_path)
+    assert reloaded.codec.name == "i8" and len(reloaded) == 40
+    np.testing.assert_allclose(np.asarray(reloaded.embedding_matrix[:40]), vectors, atol=0.02)
+    reloaded._encode_text = lambda text: vectors[11]
+    assert reloaded.query("anything", top_k=1)[0].row_id == 11
+    reloaded.close()
+
+def test_pq_rows_stay_staged_until_train_size(tmp_path):
+    vectors = _embeddings(64)
+    engine = _open(tmp_path, codec=PQCodec(n_subvectors=4, n_centroids=16, train_size=48))
+    _fill(engine, vectors[:10])
+    engine.close()
+
+    # A flush before train_size commits the raw rows instead of fitting codebooks on them
+    assert json.loads((tmp_path / MANIFEST_FILE).read_text())["staged"]
+    reloaded = _open(tmp_path)
+    assert len(reloaded) == 10 and not reloaded.codec.is_trained
+    np.testing.assert_array_equal(np.asarray(reloaded.embedding_matrix), vectors[:10])
+
+    _fill(reloaded, vectors[10:], first=10)
+    assert reloaded.codec.is_trained and reloaded.get_storage_stats()["staged"] == 0
+    assert not (tmp_path / STAGING_COLUMN).exists()
+    reloaded.close()
+
+    trained = _open(tmp_path)
+    assert trained.codec.is_trained and len(trained) == 64
+    assert not json.loads((tmp_path / MANIFEST_FILE).read_text())["staged"]
+    trained.close()
+
+def test_truncated_store_disables_persistence(tmp_path):
+    engine = _open(tmp_path)
+    _fill(engine, _embeddings(10))
+    engine.close()
+
+    store = tmp_path / EMBEDDINGS_FILE.format(codec="f32")
+    store.write_bytes(store.read_bytes()[:DIM * 4 * 5])
+
+    reloaded = _open(tmp_path)
+    assert len(reloaded) == 0 and not reloaded.persist
+    reloaded.close()